@@ -9,45 +9,140 @@ import time
 import re
 import json
 import uuid
-import traceback
-from databricks.sdk import WorkspaceClient
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from databricks.sdk.service.serving import ChatMessage, ChatMessageRole
-from databricks.sdk.service.sql import StatementState
+from databricks.sdk.service.sql import StatementState, StatementParameterListItem
 from tools import SuperAdvisorTools
 from validation import LLMJudgeValidator, DeterministicValidator
 from config import (
     MAIN_LLM_ENDPOINT, MAIN_LLM_TEMPERATURE, MAIN_LLM_MAX_TOKENS,
-    JUDGE_LLM_ENDPOINT, MAX_VALIDATION_ATTEMPTS, SQL_WAREHOUSE_ID, calculate_llm_cost
+    JUDGE_LLM_ENDPOINT, MAX_VALIDATION_ATTEMPTS, SQL_WAREHOUSE_ID, calculate_llm_cost,
+    detect_model_type
 )
 from utils.formatting import get_currency, get_currency_symbol, safe_float
 from country_config import get_authority, get_country_config, get_balance_terminology
 from prompts_registry import get_prompts_registry
 from react_loop import ReactAgenticLoop, AgentState
-from agents.context_formatter import get_context_formatter
+from agents.context_formatter import get_context_formatter, has_greeting
 from agents.response_builder import get_response_builder
+from utils.lakehouse import get_workspace_client
+from shared.cache import SemanticCache, TTLCache, make_cache_key
 from shared.logging_config import get_logger
 
 logger = get_logger(__name__)
 
+# Section banner for process_query logs
+_BANNER = "=" * 70
+
+# Static response footer pieces (built once, reused for every response)
+_CITATIONS_HEADER = "\n\n---\n\n### References & Citations\n\n"
+_DISCLAIMER_BLOCK = (
+    "\n**Disclaimer:**\n"
+    "- This advice is generated by an AI system for educational guidance only\n"
+    "- Does not constitute personal financial advice\n"
+    "- Please consult a qualified advisor before making financial decisions\n"
+)
+_CITATIONS_INTRO = "Based on the following regulatory authorities and guidelines:\n\n"
+# Footer for replies that used no tools: nothing to cite, so no references block
+_GENERIC_DISCLAIMER = "\n\n---\n" + _DISCLAIMER_BLOCK
+# Fully static footer used whenever no citations were found
+_GENERIC_FOOTER = (
+    _CITATIONS_HEADER
+    + "References: General retirement and pension regulations\n"
+    + _DISCLAIMER_BLOCK
+)
+
+# citation_registry is near-static regulatory data: lookups are cached at
+# module level so every agent instance shares them
+CITATION_CACHE_TTL_SECONDS = 6 * 3600
+_citation_cache = TTLCache(maxsize=256, ttl=CITATION_CACHE_TTL_SECONDS)
+# Rendered (citations, footer) per (country, tool set); cleared with the index
+_citations_section_cache = TTLCache(maxsize=256, ttl=CITATION_CACHE_TTL_SECONDS)
+
+# Exact-match cache of complete process_query results. Short TTL bounds how
+# stale an answer can get if the member profile changes underneath it.
+RESULT_CACHE_TTL_SECONDS = 600
+_result_cache = TTLCache(maxsize=1024, ttl=RESULT_CACHE_TTL_SECONDS)
+
+# Paraphrase-tolerant cache of process_query results (opt-in, see __init__)
+SEMANTIC_CACHE_THRESHOLD = 0.92
+_semantic_cache = SemanticCache(threshold=SEMANTIC_CACHE_THRESHOLD, ttl=RESULT_CACHE_TTL_SECONDS)
+
+# Tool slots in the citation query are padded with NULLs to this size so the
+# statement text is identical for every request (warehouse plan-cache reuse)
+CITATION_TOOL_SLOTS = 6
+
+
+def _citation_query(slots):
+    """Build the parameterized citation query for ``slots`` tool placeholders."""
+    placeholders = ", ".join(f":t{i}" for i in range(slots))
+    return (
+        "SELECT DISTINCT\n"
+        "  citation_id, country, authority, regulation_name,\n"
+        "  regulation_code, source_url, description\n"
+        "FROM super_advisory_demo.member_data.citation_registry\n"
+        "WHERE country = :country\n"
+        f"  AND tool_type IN ({placeholders})\n"
+        "ORDER BY citation_id"
+    )
+
+
+_CITATION_QUERY = _citation_query(CITATION_TOOL_SLOTS)
+
+# Whole-table citation index: (country, tool_type) -> citations. The registry
+# is small, so one full load replaces per-request warehouse round-trips.
+_CITATION_INDEX_QUERY = (
+    "SELECT citation_id, country, authority, regulation_name,\n"
+    "  regulation_code, source_url, description, tool_type\n"
+    "FROM super_advisory_demo.member_data.citation_registry"
+)
+CITATION_INDEX_RETRY_SECONDS = 300
+_citation_index = None
+_citation_index_loaded_at = 0.0
+_citation_index_failed_at = None
+_citation_index_lock = threading.Lock()
+
+
+def _citation_index_fresh():
+    """True when the shared citation index is loaded and within its TTL."""
+    return (
+        _citation_index is not None
+        and time.monotonic() - _citation_index_loaded_at < CITATION_CACHE_TTL_SECONDS
+    )
+
+
+# Columns required by _row_to_citation, and by the index (which adds tool_type)
+CITATION_ROW_COLUMNS = 7
+CITATION_INDEX_COLUMNS = 8
+
+def _row_to_citation(row):
+    """Map a citation_registry row (first seven columns) to a citation dict."""
+    return {
+        'citation_id': row[0],
+        'country': row[1],
+        'authority': row[2],
+        'regulation_name': row[3],
+        'regulation_code': row[4],
+        'source_url': row[5],
+        'description': row[6]
+    }
+
 class SuperAdvisorAgent:
     """Multi-country superannuation/retirement advisor agent with validation."""
     
     def __init__(self, tools=None, validator=None, main_llm_endpoint=None, validation_mode="llm_judge",
-                 enable_mlflow_prompts=True):
-        self.w = WorkspaceClient()
+                 enable_mlflow_prompts=True, enable_result_cache=True, enable_semantic_cache=False):
+        self.w = get_workspace_client()
+        self.enable_result_cache = enable_result_cache
+        # Costs one embedding call per cache miss, so it is opt-in
+        self.enable_semantic_cache = enable_semantic_cache
         self.tools = tools or SuperAdvisorTools()
         self.main_llm_endpoint = main_llm_endpoint or MAIN_LLM_ENDPOINT
         self.validation_mode = validation_mode
 
         # Determine model type for cost calculation
-        if "opus" in self.main_llm_endpoint.lower():
-            self.model_type = "claude-opus-4-1"
-        elif "sonnet" in self.main_llm_endpoint.lower():
-            self.model_type = "claude-sonnet-4"
-        elif "haiku" in self.main_llm_endpoint.lower():
-            self.model_type = "claude-haiku-4"
-        else:
-            self.model_type = "claude-sonnet-4"
+        self.model_type = detect_model_type(self.main_llm_endpoint)
 
         # Set up validator
         if validation_mode == "llm_judge":
@@ -71,10 +166,10 @@ class SuperAdvisorAgent:
             model_type=self.model_type
         )
 
-        logger.info(f"SuperAdvisorAgent initialized with main LLM: {self.main_llm_endpoint}")
-        logger.info(f"Synthesis model: {self.model_type}")
-        logger.info(f"Validation mode: {validation_mode}")
-        logger.info(f"Prompts registry: {'MLflow enabled' if enable_mlflow_prompts else 'MLflow disabled'}")
+        logger.info("SuperAdvisorAgent initialized with main LLM: %s", self.main_llm_endpoint)
+        logger.info("Synthesis model: %s", self.model_type)
+        logger.info("Validation mode: %s", validation_mode)
+        logger.info("Prompts registry: %s", "MLflow enabled" if enable_mlflow_prompts else "MLflow disabled")
     
     # ========== UTILITY METHODS ==========
  
@@ -106,17 +201,17 @@ class SuperAdvisorAgent:
         """Format tool results for context (delegates to ContextFormatter)."""
         return self.context_formatter.format_tool_results(tool_results, country)
     
-    def generate_response(self, user_query, context, tool_results, validation_history=None):
+    def generate_response(self, user_query, context, tool_results, country, validation_history=None,
+                          tool_context=None):
         """Generate AI response (delegates to ResponseBuilder)."""
-        country = self.get_country_from_context(context)
-
         # Use response builder to generate response
         result = self.response_builder.generate_response(
             user_query=user_query,
             context=context,
             tool_results=tool_results,
             country=country,
-            validation_history=validation_history
+            validation_history=validation_history,
+            tool_context=tool_context
         )
 
         # Convert ResponseResult dataclass to dictionary for backwards compatibility
@@ -125,113 +220,249 @@ class SuperAdvisorAgent:
             "input_tokens": result.input_tokens,
             "output_tokens": result.output_tokens,
             "cost": result.cost,
-            "duration": result.duration
+            "duration": result.duration,
+            "cached": result.cached
         }
     
     # ========== NEW CITATION METHODS (FROM agent-2.py) ==========
     
     def get_citations_for_tools(self, country, tools_used):
-        """Fetch citations from database."""
+        """Fetch citations (in-process index, falling back to a per-request query)."""
         try:
             country_upper = country.upper() if country else "AU"
             if not tools_used:
                 return []
             
-            logger.info(f"📚 Fetching citations for {country_upper}, tools: {tools_used}")
+            index = self._get_citation_index()
+            if index is not None:
+                seen = {}
+                for tool in tools_used:
+                    for citation in index.get((country_upper, tool), ()):
+                        seen[citation['citation_id']] = citation
+                return sorted(seen.values(), key=lambda c: c['citation_id'])
             
-            # Build query
-            query_parts = []
-            query_parts.append("SELECT DISTINCT")
-            query_parts.append("  citation_id, country, authority, regulation_name,")
-            query_parts.append("  regulation_code, source_url, description")
-            query_parts.append("FROM super_advisory_demo.member_data.citation_registry")
-            query_parts.append(f"WHERE country = '{country_upper}'")
+            cache_key = (country_upper, frozenset(tools_used))
+            cached = _citation_cache.get(cache_key)
+            if cached is not None:
+                logger.debug("📚 Citation cache hit for %s, tools: %s", country_upper, tools_used)
+                return list(cached)
             
-            # Add tool conditions
-            tool_conditions = [f"tool_type = '{tool}'" for tool in tools_used]
-            where_clause = " OR ".join(tool_conditions)
-            query_parts.append(f"  AND ({where_clause})")
-            query_parts.append("ORDER BY citation_id")
+            citations = self._query_citations(country_upper, tools_used)
+            if citations is not None:
+                _citation_cache.set(cache_key, tuple(citations))
+            return citations or []
             
-            query = "\n".join(query_parts)
+        except Exception as e:
+            logger.error("❌ Citation fetch error: %s", e, exc_info=True)
+            return []
+    
+    def _query_citations(self, country_upper, tools_used):
+        """Run the parameterized citation query for one country/tool set (None on failure)."""
+        logger.info("📚 Fetching citations for %s, tools: %s", country_upper, tools_used)
+        
+        # Bind values as parameters; unused tool slots are NULL (never match)
+        tools = list(dict.fromkeys(tools_used))
+        slots = max(CITATION_TOOL_SLOTS, len(tools))
+        query = _CITATION_QUERY if slots == CITATION_TOOL_SLOTS else _citation_query(slots)
+        parameters = [StatementParameterListItem(name="country", value=country_upper)]
+        parameters.extend(
+            StatementParameterListItem(name=f"t{i}", value=tools[i] if i < len(tools) else None)
+            for i in range(slots)
+        )
+        
+        result = self.w.statement_execution.execute_statement(
+            warehouse_id=SQL_WAREHOUSE_ID,
+            statement=query,
+            parameters=parameters,
+            wait_timeout="30s"
+        )
+        
+        status_name = result.status.state.name if hasattr(result.status.state, 'name') else str(result.status.state)
+        
+        if status_name != "SUCCEEDED":
+            logger.warning("⚠️ Query failed: %s", status_name)
+            return None
+        
+        # Parse results
+        citations = []
+        if result.result and hasattr(result.result, 'data_array') and result.result.data_array:
+            rows = result.result.data_array
+            logger.info("✅ Found %d citations", len(rows))
             
-            # Execute query
+            citations = [_row_to_citation(row) for row in rows if len(row) >= CITATION_ROW_COLUMNS]
+            if len(citations) != len(rows):
+                logger.warning("⚠️ Skipped %d malformed citation rows", len(rows) - len(citations))
+        else:
+            logger.warning("⚠️ No citations found")
+        
+        return citations
+    
+    def _get_citation_index(self):
+        """Return the shared citation index, loading it on first use or after its TTL."""
+        global _citation_index, _citation_index_loaded_at, _citation_index_failed_at
+        
+        if _citation_index_fresh():
+            return _citation_index
+        failed_at = _citation_index_failed_at
+        if failed_at is not None and time.monotonic() - failed_at < CITATION_INDEX_RETRY_SECONDS:
+            return _citation_index  # Stale index (or None) until the retry window passes
+        
+        with _citation_index_lock:
+            # Another thread may have loaded it while we waited
+            if _citation_index_fresh():
+                return _citation_index
+            
+            index = self._load_citation_index()
+            if index is None:
+                _citation_index_failed_at = time.monotonic()
+                return _citation_index
+            
+            _citation_index = index
+            _citation_index_loaded_at = time.monotonic()
+            _citation_index_failed_at = None
+            _citations_section_cache.clear()  # Footers may reference changed rows
+            return index
+    
+    def _load_citation_index(self):
+        """Load citation_registry in one statement and index it by (country, tool_type)."""
+        try:
             result = self.w.statement_execution.execute_statement(
                 warehouse_id=SQL_WAREHOUSE_ID,
-                statement=query,
+                statement=_CITATION_INDEX_QUERY,
                 wait_timeout="30s"
             )
-            
             status_name = result.status.state.name if hasattr(result.status.state, 'name') else str(result.status.state)
-            
             if status_name != "SUCCEEDED":
-                logger.warning(f"⚠️ Query failed: {status_name}")
-                return []
-            
-            # Parse results
-            citations = []
-            if result.result and hasattr(result.result, 'data_array') and result.result.data_array:
-                rows = result.result.data_array
-                logger.info(f"✅ Found {len(rows)} citations")
-                
-                for row in rows:
-                    try:
-                        citations.append({
-                            'citation_id': row[0],
-                            'country': row[1],
-                            'authority': row[2],
-                            'regulation_name': row[3],
-                            'regulation_code': row[4],
-                            'source_url': row[5],
-                            'description': row[6]
-                        })
-                    except Exception as parse_err:
-                        logger.warning(f"⚠️ Error parsing row: {parse_err}")
-            else:
-                logger.warning("⚠️ No citations found")
+                logger.warning("⚠️ Citation index load failed: %s", status_name)
+                return None
             
-            return citations
+            index = {}
+            rows = (result.result.data_array if result.result else None) or []
+            skipped = 0
+            for row in rows:
+                if len(row) < CITATION_INDEX_COLUMNS:
+                    skipped += 1
+                    continue
+                index.setdefault((str(row[1]).upper(), row[7]), []).append(_row_to_citation(row))
+            if skipped:
+                logger.warning("⚠️ Skipped %d malformed citation rows", skipped)
             
+            logger.info("📚 Citation index loaded: %d rows, %d (country, tool) keys", len(rows), len(index))
+            return index
         except Exception as e:
-            logger.error(f"❌ Citation fetch error: {e}", exc_info=True)
-            return []
+            logger.warning("⚠️ Citation index load error: %s", e)
+            return None
+    
+    def refresh_citations(self):
+        """Reload the citation index now (e.g. after citation_registry is updated)."""
+        self.invalidate_citation_cache()
+        return self._get_citation_index() is not None
+    
+    def invalidate_citation_cache(self):
+        """Drop cached citation lookups (e.g. after citation_registry is updated)."""
+        global _citation_index, _citation_index_failed_at
+        with _citation_index_lock:
+            _citation_index = None
+            _citation_index_failed_at = None
+        _citation_cache.clear()
+        _citations_section_cache.clear()
+        logger.info("🧹 Citation cache cleared")
     
     def format_citation(self, citation):
         """Format a single citation entry."""
         parts = [f"{citation['citation_id']} - {citation['authority']}"]
         
-        if citation.get('regulation_name'):
-            parts.append(f"{citation['regulation_name']}")
+        regulation_name = citation.get('regulation_name')
+        if regulation_name:
+            parts.append(str(regulation_name))
         
-        if citation.get('regulation_code'):
-            parts.append(f"({citation['regulation_code']})")
+        regulation_code = citation.get('regulation_code')
+        if regulation_code:
+            parts.append(f"({regulation_code})")
         
         return " ".join(parts)
     
-    def add_citations_and_disclaimer(self, response, country, tools_used):
-        """Add citations and disclaimer to response."""
+    def add_citations_and_disclaimer(self, response, country, tools_used, citations=None):
+        """Add citations and disclaimer to response (pass ``citations`` to skip the lookup)."""
+        if citations is None:
+            return response + self.get_citations_and_section(country, tools_used)[1]
+        return response + self.build_citations_section(country, tools_used, citations)
+    
+    def get_citations_and_section(self, country, tools_used):
+        """
+        Return (citations, rendered footer) for a country and tool set.
+        
+        The footer is deterministic for a given (country, set of tools), so it
+        is rendered once and reused until the citation index is reloaded or
+        invalidated. Empty lookups are not cached, since they may be failures.
+        """
+        if not tools_used:
+            return [], _GENERIC_DISCLAIMER
+        
+        key = (country.upper() if country else "AU", frozenset(tools_used))
+        cached = _citations_section_cache.get(key)
+        if cached is not None:
+            citations, section = cached
+            return list(citations), section
+        
         citations = self.get_citations_for_tools(country, tools_used)
+        section = self.build_citations_section(country, tools_used, citations)
+        if citations:
+            _citations_section_cache.set(key, (tuple(citations), section))
+        return citations, section
+    
+    def build_citations_section(self, country, tools_used, citations=None):
+        """Build the references + disclaimer footer appended to every response."""
+        if not tools_used:
+            return _GENERIC_DISCLAIMER
         
-        citations_section = "\n\n---\n\n### References & Citations\n\n"
+        if citations is None:
+            citations = self.get_citations_for_tools(country, tools_used)
         
-        if citations and len(citations) > 0:
-            citations_section += "Based on the following regulatory authorities and guidelines:\n\n"
-            
-            for citation in citations:
-                formatted = self.format_citation(citation)
-                citations_section += f"- {formatted}\n"
-                
-                if citation.get('source_url'):
-                    citations_section += f"  Source: {citation['source_url']}\n"
-        else:
-            citations_section += "References: General retirement and pension regulations\n"
+        if not citations:
+            return _GENERIC_FOOTER
         
-        citations_section += "\n**Disclaimer:**\n"
-        citations_section += "- This advice is generated by an AI system for educational guidance only\n"
-        citations_section += "- Does not constitute personal financial advice\n"
-        citations_section += "- Please consult a qualified advisor before making financial decisions\n"
+        entries = []
+        for citation in citations:
+            source_url = citation.get('source_url')
+            entries.append(
+                f"- {self.format_citation(citation)}\n  Source: {source_url}\n"
+                if source_url else
+                f"- {self.format_citation(citation)}\n"
+            )
         
-        return response + citations_section
+        return f"{_CITATIONS_HEADER}{_CITATIONS_INTRO}{''.join(entries)}{_DISCLAIMER_BLOCK}"
+    
+    def finalize_response(self, response_text, anonymized_name, real_name, country,
+                          tools_used, citations=None, needs_restore=True,
+                          citations_section=None):
+        """
+        Restore the member name, add the greeting and append citations in one pass.
+        
+        Equivalent to restore_member_name → add_personalized_greeting →
+        add_citations_and_disclaimer, but materializes the final string once
+        instead of allocating an intermediate copy per step. A footer already
+        rendered off the critical path can be passed as ``citations_section``.
+        """
+        # replace() is a single pass and returns the same object when the
+        # alias never made it into the LLM output, so no separate 'in' scan
+        body = response_text
+        if needs_restore and anonymized_name and real_name:
+            body = body.replace(anonymized_name, real_name)
+        
+        # Greeting check anchors at the start of the text instead of copying it via strip()
+        parts = []
+        if real_name and real_name != "Unknown Member" and not has_greeting(body):
+            parts.append(f"Hi {real_name},\n\n")
+        parts.append(body)
+        if citations_section is None:
+            if citations is None:
+                citations_section = self.get_citations_and_section(country, tools_used)[1]
+            else:
+                citations_section = self.build_citations_section(country, tools_used, citations)
+        parts.append(citations_section)
+        
+        return "".join(parts)
     
     # ========== MAIN PROCESS_QUERY METHOD (UPDATED WITH CITATIONS) ==========
     
@@ -255,9 +486,41 @@ class SuperAdvisorAgent:
         This method now delegates to ReactAgenticLoop for the core logic,
         keeping this interface simple and focused on data preparation.
         """
-        logger.info("="*70)
-        logger.info(f"🚀 SuperAdvisor Processing Query")
-        logger.info("="*70)
+        logger.info(_BANNER)
+        logger.info("🚀 SuperAdvisor Processing Query")
+        logger.info(_BANNER)
+        
+        # Exact-match cache: same member, question and settings → reuse answer
+        cache_key = None
+        if self.enable_result_cache:
+            cache_key = make_cache_key(
+                member_id,
+                user_query.strip().casefold(),
+                withdrawal_amount,
+                self.main_llm_endpoint,
+                self.validation_mode
+            )
+            cached = _result_cache.get(cache_key)
+            if cached is not None:
+                logger.info("💾 Result cache hit for member %s", member_id)
+                # No LLM work was done for this request: report zero attempts/cost
+                return {**cached, "synthesis_results": [], "validation_results": [], "cached": True}
+        
+        # Semantic cache: same member and settings, paraphrased question
+        semantic_scope = query_embedding = None
+        if self.enable_semantic_cache:
+            semantic_scope = make_cache_key(
+                member_id, withdrawal_amount, self.main_llm_endpoint, self.validation_mode
+            )
+            try:
+                query_embedding = self.react_loop.classifier.embed(user_query)
+            except Exception as e:
+                logger.warning("⚠️ Semantic cache embedding failed: %s", e)
+            if query_embedding is not None:
+                cached = _semantic_cache.get(semantic_scope, query_embedding)
+                if cached is not None:
+                    logger.info("💾 Semantic cache hit for member %s", member_id)
+                    return {**cached, "synthesis_results": [], "validation_results": [], "cached": True}
         
         # Get member profile
         member_profile = self.tools.get_member_profile(member_id)
@@ -267,13 +530,17 @@ class SuperAdvisorAgent:
         country = member_profile.get("country", "AU")
         real_name = member_profile.get("name", "Unknown Member")
         
-        logger.info(f"🌍 Member: {member_id} | Country: {country}")
+        # Country is known: load citations in the background while we classify
+        if not _citation_index_fresh():
+            self.react_loop.warm_citation_index()
+        
+        logger.info("🌍 Member: %s | Country: %s", member_id, country)
         
         # Build context with anonymization
         context_data = self.build_base_context(member_profile, anonymize=True)
         context = context_data["text"]
         anonymized_name = context_data["anonymized_name"]
-        logger.info(f"✅ Base context created: {len(context)} chars")
+        logger.info("✅ Base context created: %d chars", len(context))
         
         # Initialize agent state
         state = AgentState(
@@ -284,16 +551,58 @@ class SuperAdvisorAgent:
             withdrawal_amount=withdrawal_amount,
             context=context,
             real_name=real_name,
-            anonymized_name=anonymized_name
+            anonymized_name=anonymized_name,
+            needs_restore=context_data["needs_restore"]
         )
         
         # Run the ReAct agentic loop
         logger.info("\n🤖 Starting ReAct Agentic Loop...")
-        logger.info("="*70)
+        logger.info(_BANNER)
         result = self.react_loop.run_agentic_loop(state)
 
-        logger.info("\n" + "="*70)
-        logger.info(f"✅ Query Processing Complete - Attempts: {result.get('attempts', 0)}")
-        logger.info("="*70)
+        logger.info("\n%s", _BANNER)
+        logger.info("✅ Query Processing Complete - Attempts: %s", result.get('attempts', 0))
+        logger.info(_BANNER)
+        
+        # Only cache answers that passed validation
+        if result.get("validation", {}).get("passed"):
+            if cache_key is not None:
+                _result_cache.set(cache_key, result)
+            if query_embedding is not None:
+                _semantic_cache.set(semantic_scope, query_embedding, result)
         
         return result
+    
+    def process_queries_batch(self, requests, concurrency=8):
+        """
+        Process several member queries concurrently.
+        
+        Each query is I/O bound (SQL tools, LLM synthesis, judge), so a
+        bounded thread pool overlaps their round-trips while ``concurrency``
+        caps in-flight requests against the serving endpoint rate limit.
+        
+        Args:
+            requests: List of dicts with ``member_id``, ``user_query`` and
+                optional ``withdrawal_amount`` (process_query kwargs)
+            concurrency: Maximum number of queries processed at once
+            
+        Returns:
+            List of result dictionaries, in the same order as ``requests``
+        """
+        if not requests:
+            return []
+        
+        max_workers = max(1, min(concurrency, len(requests)))
+        logger.info("📦 Processing batch of %d queries (concurrency=%d)", len(requests), max_workers)
+        
+        results = []
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="batch-query") as pool:
+            futures = [pool.submit(self.process_query, **request) for request in requests]
+            for request, future in zip(requests, futures):
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    logger.error("❌ Batch query failed for %s: %s", request.get('member_id'), e, exc_info=True)
+                    results.append({"error": str(e), "member_id": request.get("member_id")})
+        
+        return results
@@ -8,62 +8,191 @@
 
 from agent import SuperAdvisorAgent
 from agents.orchestrator import AgentOrchestrator
-from utils.audit import log_query_event, _escape_sql
+from utils.audit import log_query_event
 from utils.progress import initialize_progress_tracker, reset_progress_tracker, mark_phase_running, mark_phase_complete, mark_phase_error
-from observability import create_observability
-import traceback, uuid, time, threading
-import mlflow
+import traceback, uuid, time, threading, atexit, logging, os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait
 import json
-from datetime import datetime
-from databricks.sdk import WorkspaceClient
-from config import UNITY_CATALOG, SQL_WAREHOUSE_ID, MLFLOW_PROD_EXPERIMENT_PATH
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from functools import lru_cache
+from databricks.sdk.service.sql import (
+    ExecuteStatementRequestOnWaitTimeout, StatementParameterListItem, StatementState
+)
+from utils.lakehouse import get_workspace_client
+from config import UNITY_CATALOG, SQL_WAREHOUSE_ID, MLFLOW_PROD_EXPERIMENT_PATH, MLFLOW_ENABLED
 
 # ✅ CORRECT TABLE PATH
+from shared.cache import TTLCache
 from shared.logging_config import get_logger
 
 logger = get_logger(__name__)
 
+_BANNER = "=" * 70
+
 GOVERNANCE_TABLE = "super_advisory_demo.member_data.governance"
 
+# Governance columns (name, SQL type) in table order, for bound INSERT parameters
+GOVERNANCE_COLUMNS = (
+    ("event_id", "STRING"), ("timestamp", "STRING"), ("user_id", "STRING"),
+    ("session_id", "STRING"), ("country", "STRING"), ("query_string", "STRING"),
+    ("agent_response", "STRING"), ("result_preview", "STRING"), ("cost", "DOUBLE"),
+    ("citations", "STRING"), ("tool_used", "STRING"), ("judge_response", "STRING"),
+    ("judge_verdict", "STRING"), ("error_info", "STRING"), ("validation_mode", "STRING"),
+    ("validation_attempts", "INT"), ("total_time_seconds", "DOUBLE"),
+)
+GOVERNANCE_COLUMN_NAMES = tuple(name for name, _ in GOVERNANCE_COLUMNS)
+GOVERNANCE_COLUMN_TYPES = tuple(sql_type for _, sql_type in GOVERNANCE_COLUMNS)
+# Rows per INSERT (keeps the statement under the warehouse's parameter limits)
+GOVERNANCE_BATCH_SIZE = 8
+# Rows buffered in memory while the warehouse is slow; overflow spills to disk
+GOVERNANCE_QUEUE_MAX = 10_000
+GOVERNANCE_MAX_RETRIES = 3
+GOVERNANCE_RETRY_BASE_SECONDS = 0.5
+# Rows that exhaust their retries are appended here (owner-only, 0o600: they
+# hold member queries and responses) and replayed when the writer next starts
+GOVERNANCE_SPILL_PATH = os.environ.get("GOVERNANCE_SPILL_PATH", "/tmp/governance_spill.jsonl")
+# Event ids already logged are remembered this long, so a repeated submission
+# of the same query's audit row is dropped instead of double-inserted
+GOVERNANCE_DEDUPE_TTL_SECONDS = 3600
+# Set GOVERNANCE_SYNC_WRITES=1 to run phase 8 and write each row before
+# agent_query returns (strict audit runs)
+GOVERNANCE_SYNC_WRITES = os.environ.get("GOVERNANCE_SYNC_WRITES") == "1"
+
+
+@lru_cache(maxsize=GOVERNANCE_BATCH_SIZE)
+def _governance_insert_sql(row_count):
+    """Parameterized multi-row INSERT for ``row_count`` governance rows."""
+    columns = range(len(GOVERNANCE_COLUMN_TYPES))
+    values = ", ".join(
+        "(" + ", ".join(f":r{r}c{c}" for c in columns) + ")"
+        for r in range(row_count)
+    )
+    return f"INSERT INTO {GOVERNANCE_TABLE} VALUES {values}"
+
+# Phases whose work happens inside the agent; agent_query only records them.
+# phase_key -> (label, confirmation line)
+PASSTHROUGH_PHASES = {
+    'phase_2_anonymization': ("Privacy Anonymization", "✓ Data anonymization ready"),
+    'phase_7_restoration': ("Name Restoration", "✓ Member name restored"),
+}
+
+
+def _mark_passthrough_phase(orchestrator, phase_key):
+    """Record a passthrough phase on the tracker and return its duration."""
+    label, confirmation = PASSTHROUGH_PHASES[phase_key]
+    with orchestrator.track_phase(label, phase_key):
+        logger.info(confirmation)
+    return orchestrator.get_last_phase_duration()
+
+# Phase 8 (MLflow + governance writes) runs here, off the request path.
+# Pending writes are flushed on interpreter exit (see _shutdown_audit).
+_audit_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="audit")
+
+# Per-stage observability logging (classification/tools/synthesis) runs here;
+# the run is only closed once these have landed (bounded by the timeout)
+_obs_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="obs")
+OBS_FLUSH_TIMEOUT_SECONDS = 5.0
+
+
+def _run_audit_task(fn, *args, **kwargs):
+    """Run phase-8 work on the request thread under GOVERNANCE_SYNC_WRITES, else on the audit pool."""
+    if GOVERNANCE_SYNC_WRITES:
+        fn(*args, **kwargs)
+    else:
+        _audit_executor.submit(fn, *args, **kwargs)
+
 class AuditLogger:
     """Handles MLflow and UC Governance logging"""
     
     def __init__(self):
-        self.w = WorkspaceClient()
+        # Governance rows waiting for the writer thread's next batched INSERT
+        self._pending_rows = deque()
+        self._pending = threading.Condition()
+        self._spill_lock = threading.Lock()
+        self._closed = False
+        self._startup_replay_done = threading.Event()
+        self._logged_events = TTLCache(maxsize=1024, ttl=GOVERNANCE_DEDUPE_TTL_SECONDS)
+        self._dedupe_lock = threading.Lock()
+        
+        # Shared keep-alive client (same pool as the agent's statement calls)
+        self.w = get_workspace_client()
         self.warehouse_id = SQL_WAREHOUSE_ID
         
-        try:
-            mlflow.set_tracking_uri("databricks")
-            mlflow.set_experiment(MLFLOW_PROD_EXPERIMENT_PATH)
-        except Exception as e:
-            logger.info(f"⚠️ MLflow init: {e}")
+        self.experiment_id = None
+        self.mlflow_client = None
+        if MLFLOW_ENABLED:
+            # Imported here so the agent pipeline never loads mlflow under MLFLOW_DISABLED=1
+            import mlflow
+            from observability import ensure_mlflow_experiment
+            try:
+                self.experiment_id = ensure_mlflow_experiment(MLFLOW_PROD_EXPERIMENT_PATH)
+            except Exception as e:
+                logger.info(f"⚠️ MLflow init: {e}")
+            
+            # Reused for log_batch; MLflow keeps one HTTP session per tracking host
+            self.mlflow_client = mlflow.tracking.MlflowClient()
+        
+        self._writer = threading.Thread(
+            target=self._drain_governance_rows,
+            name="governance-writer",
+            daemon=True
+        )
+        self._writer.start()
     
     def log_to_mlflow(self, session_id, user_id, country, query_string, 
                       answer, judge_verdict, tools_called, elapsed, 
                       cost_breakdown=None, error_info=None):
         """Log to MLflow with detailed cost breakdown"""
+        if not MLFLOW_ENABLED:
+            return
+        
+        import mlflow
+        from mlflow.entities import Metric, Param
+        
         try:
-            with mlflow.start_run(run_name=f"query-{session_id}"):
-                mlflow.log_param("user_id", user_id)
-                mlflow.log_param("session_id", session_id)
-                mlflow.log_param("country", country)
-                mlflow.log_param("tools_used", ",".join(tools_called) if tools_called else "none")
-                mlflow.log_param("validation_mode", judge_verdict.get("validation_mode", "llm_judge"))
+            with mlflow.start_run(experiment_id=self.experiment_id, run_name=f"query-{session_id}") as run:
+                # One log_batch round-trip instead of a REST call per param/metric
+                params = [
+                    Param("user_id", str(user_id)),
+                    Param("session_id", str(session_id)),
+                    Param("country", str(country)),
+                    Param("tools_used", ",".join(tools_called) if tools_called else "none"),
+                    Param("validation_mode", str(judge_verdict.get("validation_mode", "llm_judge"))),
+                ]
                 
-                mlflow.log_metric("query_length", len(query_string))
-                mlflow.log_metric("response_length", len(answer) if answer else 0)
-                mlflow.log_metric("validation_confidence", judge_verdict.get("confidence", 0))
-                mlflow.log_metric("runtime_sec", elapsed)
-                mlflow.log_metric("validation_attempts", judge_verdict.get("attempts", 1))
+                metric_values = {
+                    "query_length": len(query_string),
+                    "response_length": len(answer) if answer else 0,
+                    "validation_confidence": judge_verdict.get("confidence", 0),
+                    "runtime_sec": elapsed,
+                    "validation_attempts": judge_verdict.get("attempts", 1),
+                }
                 
                 # 🆕 ADD: Log cost metrics
                 if cost_breakdown:
-                    mlflow.log_metric("total_cost_usd", cost_breakdown.get('total', {}).get('total_cost', 0))
-                    mlflow.log_metric("synthesis_cost_usd", cost_breakdown.get('synthesis', {}).get('cost', 0))
-                    mlflow.log_metric("validation_cost_usd", cost_breakdown.get('validation', {}).get('cost', 0))
-                    mlflow.log_metric("total_tokens", cost_breakdown.get('total', {}).get('total_tokens', 0))
-                    mlflow.log_metric("synthesis_tokens", cost_breakdown.get('total', {}).get('synthesis_tokens', 0))
-                    mlflow.log_metric("validation_tokens", cost_breakdown.get('total', {}).get('validation_tokens', 0))
+                    total = cost_breakdown.get('total') or {}
+                    synthesis = cost_breakdown.get('synthesis') or {}
+                    validation = cost_breakdown.get('validation') or {}
+                    metric_values["total_cost_usd"] = total.get('total_cost', 0)
+                    metric_values["synthesis_cost_usd"] = synthesis.get('cost', 0)
+                    metric_values["validation_cost_usd"] = validation.get('cost', 0)
+                    metric_values["total_tokens"] = total.get('total_tokens', 0)
+                    metric_values["synthesis_tokens"] = total.get('synthesis_tokens', 0)
+                    metric_values["validation_tokens"] = total.get('validation_tokens', 0)
+                
+                timestamp_ms = int(time.time() * 1000)
+                metrics = [
+                    Metric(key, float(value), timestamp_ms, 0)
+                    for key, value in metric_values.items()
+                ]
+                
+                self.mlflow_client.log_batch(
+                    run_id=run.info.run_id,
+                    metrics=metrics,
+                    params=params
+                )
                 
                 if judge_verdict:
                     mlflow.log_dict(judge_verdict, "validation.json")
@@ -80,30 +209,22 @@ class AuditLogger:
     
     def log_to_governance_table(self, session_id, user_id, country, query_string,
                                answer, judge_verdict, tools_called, cost, citations,
-                               elapsed, error_info=None, classification_method=None):
-        """Log to UC governance audit table"""
+                               elapsed, error_info=None, classification_method=None,
+                               event_id=None):
+        """Queue a row for the UC governance audit table (written inline when GOVERNANCE_SYNC_WRITES)"""
+        event_id = event_id or str(uuid.uuid4())
+        with self._dedupe_lock:
+            if event_id in self._logged_events:
+                logger.info("⏭️ Governance row already logged for event %s", event_id)
+                return
+            self._logged_events.set(event_id, True)
+        
         try:
-            event_id = str(uuid.uuid4())
-            timestamp = datetime.utcnow().isoformat()
-            
-            # ✅ Use escape_sql from utils.audit instead of nested function
-            query_text_escaped = _escape_sql(query_string)
             answer_truncated = answer[:15000] if answer else ""
-            agent_response_escaped = _escape_sql(answer_truncated)
-            result_preview = answer_truncated[:500] if answer_truncated else ""
-            result_preview_escaped = _escape_sql(result_preview)
-            judge_response_escaped = _escape_sql(str(judge_verdict.get('reasoning', '')))
-            judge_verdict_text = judge_verdict.get('verdict', 'UNKNOWN')
-            judge_confidence = judge_verdict.get('confidence', 0.0)  # ✅ Extract confidence
-            tool_used = tools_called[0] if tools_called else "none"
-            citations_json = json.dumps(citations) if citations else "[]"
-            citations_escaped = _escape_sql(citations_json)
-            error_text = _escape_sql(error_info) if error_info else ""
-            validation_mode = judge_verdict.get('validation_mode', 'llm_judge')
-            validation_attempts = judge_verdict.get('attempts', 1)
             
             # ✅ Store classification_method in error_info field if not null (hack for now)
             # TODO: Add classification_method column to governance table schema
+            error_text = error_info or ""
             if classification_method:
                 if error_text:
                     error_text = f"classification_method={classification_method}|{error_text}"
@@ -113,44 +234,270 @@ class AuditLogger:
             # ✅ Store judge_confidence in judge_response JSON if not already present
             # Since schema doesn't have judge_confidence column, we'll store it in judge_response as JSON
             # Format: JSON string with confidence and reasoning
-            import json as json_lib
             judge_response_data = {
                 'reasoning': judge_verdict.get('reasoning', ''),
-                'confidence': judge_confidence
+                'confidence': judge_verdict.get('confidence', 0.0)
             }
-            judge_response_escaped = _escape_sql(json_lib.dumps(judge_response_data))
+            if judge_verdict.get('cache_hit'):
+                judge_response_data['cache_hit'] = True
             
-            insert_query = f"""
-            INSERT INTO {GOVERNANCE_TABLE}
-            VALUES (
-                '{event_id}',
-                '{timestamp}',
-                '{user_id}',
-                '{session_id}',
-                '{country}',
-                '{query_text_escaped}',
-                '{agent_response_escaped}',
-                '{result_preview_escaped}',
-                {cost},
-                '{citations_escaped}',
-                '{tool_used}',
-                '{judge_response_escaped}',
-                '{judge_verdict_text}',
-                '{error_text}',
-                '{validation_mode}',
-                {validation_attempts},
-                {elapsed}
-            )
-            """
-            
-            result = self.w.statement_execution.execute_statement(
-                warehouse_id=self.warehouse_id,
-                statement=insert_query,
-                wait_timeout="10s"
+            # Values are bound as statement parameters, so nothing is SQL-escaped
+            row = (
+                event_id,
+                # Naive UTC: readers parse this column against naive cutoffs
+                datetime.now(timezone.utc).replace(tzinfo=None).isoformat(),
+                str(user_id),
+                str(session_id),
+                str(country),
+                query_string,
+                answer_truncated,
+                answer_truncated[:500],
+                cost,
+                json.dumps(citations) if citations else "[]",
+                tools_called[0] if tools_called else "none",
+                json.dumps(judge_response_data),
+                judge_verdict.get('verdict', 'UNKNOWN'),
+                error_text,
+                judge_verdict.get('validation_mode', 'llm_judge'),
+                judge_verdict.get('attempts', 1),
+                elapsed
             )
-            logger.info(f"✅ Governance table logged: {session_id}")
+            if GOVERNANCE_SYNC_WRITES:
+                self._write_governance_batch([row])
+            else:
+                self._enqueue_governance_row(row)
         except Exception as e:
             logger.info(f"⚠️ Governance logging failed: {e}")
+    
+    def _enqueue_governance_row(self, row):
+        """Hand ``row`` to the writer thread (returns immediately; spills when full)"""
+        with self._pending:
+            if len(self._pending_rows) < GOVERNANCE_QUEUE_MAX:
+                self._pending_rows.append(row)
+                self._pending.notify()
+                return
+        logger.info("⚠️ Governance queue full, spilling row to disk")
+        self._spill_governance_rows([row])
+    
+    def _drain_governance_rows(self):
+        """
+        Writer thread: send queued rows in batches of up to GOVERNANCE_BATCH_SIZE.
+        
+        Rows that arrive while an INSERT is in flight are picked up by the
+        next one, so a slow warehouse never blocks the producers. Rows spilled
+        by an earlier process are replayed first.
+        """
+        try:
+            self.replay_governance_spill()
+        except Exception as e:
+            logger.error(f"❌ Governance spill replay failed: {e}")
+        finally:
+            self._startup_replay_done.set()
+        while True:
+            with self._pending:
+                while not self._pending_rows and not self._closed:
+                    self._pending.wait()
+                if not self._pending_rows:
+                    return  # Closed and drained
+                batch_size = min(GOVERNANCE_BATCH_SIZE, len(self._pending_rows))
+                batch = [self._pending_rows.popleft() for _ in range(batch_size)]
+            self._write_governance_batch(batch)
+    
+    def _write_governance_batch(self, rows):
+        """Insert ``rows``, retrying with exponential backoff, then spill to disk"""
+        for attempt in range(GOVERNANCE_MAX_RETRIES):
+            try:
+                self._insert_governance_rows(rows)
+                logger.info(f"✅ Governance table logged: {len(rows)} row(s)")
+                return
+            except Exception as e:
+                logger.info(f"⚠️ Governance logging failed ({len(rows)} row(s), attempt {attempt + 1}): {e}")
+                if attempt + 1 < GOVERNANCE_MAX_RETRIES:
+                    time.sleep(GOVERNANCE_RETRY_BASE_SECONDS * 2 ** attempt)
+        self._spill_governance_rows(rows)
+    
+    def _insert_governance_rows(self, rows):
+        """Insert ``rows`` with one parameterized multi-row INSERT (raises unless it succeeded)"""
+        parameters = [
+            StatementParameterListItem(
+                name=f"r{r}c{c}",
+                value=None if value is None else str(value),
+                type=sql_type
+            )
+            for r, row in enumerate(rows)
+            for c, (value, sql_type) in enumerate(zip(row, GOVERNANCE_COLUMN_TYPES))
+        ]
+        # A statement still running at the timeout is cancelled, so a retry
+        # cannot race it into a duplicate insert
+        result = self.w.statement_execution.execute_statement(
+            warehouse_id=self.warehouse_id,
+            statement=_governance_insert_sql(len(rows)),
+            parameters=parameters,
+            wait_timeout="10s",
+            on_wait_timeout=ExecuteStatementRequestOnWaitTimeout.CANCEL
+        )
+        state = result.status.state if result and result.status else None
+        if state != StatementState.SUCCEEDED:
+            error = result.status.error if result and result.status else None
+            message = error.message if error and error.message else "no error message"
+            raise Exception(f"Governance INSERT ended in state {state}: {message}")
+    
+    def _spill_governance_rows(self, rows):
+        """Append ``rows`` to GOVERNANCE_SPILL_PATH as JSON lines for later replay"""
+        try:
+            with self._spill_lock:
+                # Created owner-only; O_NOFOLLOW refuses a planted symlink
+                fd = os.open(
+                    GOVERNANCE_SPILL_PATH,
+                    os.O_WRONLY | os.O_CREAT | os.O_APPEND | getattr(os, "O_NOFOLLOW", 0),
+                    0o600
+                )
+                try:
+                    os.fchmod(fd, 0o600)  # Tighten a file created before this fix
+                except OSError:
+                    os.close(fd)
+                    raise
+                with os.fdopen(fd, "a", encoding="utf-8") as spill:
+                    for row in rows:
+                        spill.write(json.dumps(dict(zip(GOVERNANCE_COLUMN_NAMES, row)), default=str))
+                        spill.write("\n")
+            logger.info(f"💾 Spilled {len(rows)} governance row(s) to {GOVERNANCE_SPILL_PATH}")
+        except Exception as e:
+            logger.error(f"❌ Governance spill failed, {len(rows)} row(s) lost: {e}")
+    
+    def replay_governance_spill(self):
+        """
+        Re-insert rows from GOVERNANCE_SPILL_PATH; rows that fail again are re-spilled.
+        
+        The spill file is first moved aside, so rows spilled during the replay
+        land in a fresh file. A replay file left by an interrupted run is
+        finished before a new one is taken.
+        
+        Returns:
+            Number of rows replayed
+        """
+        replay_path = f"{GOVERNANCE_SPILL_PATH}.replay"
+        with self._spill_lock:
+            if not os.path.exists(replay_path):
+                try:
+                    os.replace(GOVERNANCE_SPILL_PATH, replay_path)
+                except FileNotFoundError:
+                    return 0
+        
+        rows = []
+        with open(replay_path, encoding="utf-8") as spill:
+            for line in spill:
+                if not line.strip():
+                    continue
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    logger.error("❌ Skipping unreadable governance spill line")
+                    continue
+                rows.append(tuple(entry.get(name) for name in GOVERNANCE_COLUMN_NAMES))
+        
+        for start in range(0, len(rows), GOVERNANCE_BATCH_SIZE):
+            self._write_governance_batch(rows[start:start + GOVERNANCE_BATCH_SIZE])
+        os.remove(replay_path)
+        logger.info(f"🔁 Replayed {len(rows)} spilled governance row(s)")
+        return len(rows)
+    
+    def close(self, timeout=30.0):
+        """Stop the writer thread after it has drained the queue"""
+        with self._pending:
+            self._closed = True
+            self._pending.notify_all()
+        self._writer.join(timeout)
+
+
+_audit_logger = None
+_audit_logger_lock = threading.Lock()
+
+
+def get_audit_logger():
+    """
+    Get or create the process-wide AuditLogger.
+    
+    Built once so MLflow setup and the tracking/warehouse connections are
+    reused across queries instead of being re-established per request.
+    """
+    global _audit_logger
+    if _audit_logger is None:
+        with _audit_logger_lock:
+            if _audit_logger is None:
+                _audit_logger = AuditLogger()
+    return _audit_logger
+
+
+_agents = {}
+_agents_lock = threading.Lock()
+
+
+def get_agent(validation_mode):
+    """
+    Get or create the process-wide SuperAdvisorAgent for ``validation_mode``.
+    
+    Construction wires up the validator, classifier, prompts registry and
+    response builder; per-query state lives in the ReAct loop's AgentState,
+    so one agent per mode serves concurrent queries (as process_queries_batch does).
+    """
+    agent = _agents.get(validation_mode)
+    if agent is None:
+        with _agents_lock:
+            agent = _agents.get(validation_mode)
+            if agent is None:
+                agent = _agents[validation_mode] = SuperAdvisorAgent(validation_mode=validation_mode)
+    return agent
+
+
+def _shutdown_audit():
+    """Flush phase-8 work at exit: finish queued tasks, then drain governance rows."""
+    _obs_executor.shutdown(wait=True)
+    _audit_executor.shutdown(wait=True)
+    if _audit_logger is not None:
+        _audit_logger.close()
+
+
+atexit.register(_shutdown_audit)
+
+
+@dataclass
+class _ResultTotals:
+    """Aggregates over a list of synthesis or validation attempt dicts."""
+    duration: float = 0.0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cost: float = 0.0
+    model: str = ""
+    attempts: int = 0
+    
+    @property
+    def tokens(self):
+        return self.input_tokens + self.output_tokens
+    
+    def as_cost_section(self):
+        """The ``cost_breakdown['synthesis'|'validation']`` entry for these totals."""
+        return {
+            'input_tokens': self.input_tokens,
+            'output_tokens': self.output_tokens,
+            'cost': self.cost,
+            'model': self.model,
+            'attempts': self.attempts
+        }
+
+
+def _aggregate_results(results, default_model):
+    """Sum duration/tokens/cost over ``results`` in a single pass."""
+    totals = _ResultTotals(
+        model=results[0].get('model', default_model) if results else default_model,
+        attempts=len(results)
+    )
+    for item in results:
+        totals.duration += item.get('duration', 0)
+        totals.input_tokens += item.get('input_tokens', 0)
+        totals.output_tokens += item.get('output_tokens', 0)
+        totals.cost += item.get('cost', 0.0)
+    return totals
 
 
 def _async_audit_logging(
@@ -166,11 +513,13 @@ def _async_audit_logging(
     total_cost,
     citations,
     elapsed,
-    classification_method
+    classification_method,
+    obs_futures=(),
+    event_id=None
 ):
     """
     Async function to handle audit logging in background.
-    Runs in a separate thread to avoid blocking response.
+    Runs on the audit executor to avoid blocking the response.
     Note: Phase tracking happens in main thread, not here.
     """
     try:
@@ -191,14 +540,16 @@ def _async_audit_logging(
                 citations=citations,
                 elapsed=elapsed,
                 error_info=None,
-                classification_method=classification_method
+                classification_method=classification_method,
+                event_id=event_id
             )
             logger.info(f"✅ Governance table logged: {session_id}")
         except Exception as gov_error:
             logger.error(f"⚠️ Governance logging failed: {gov_error}", exc_info=True)
 
-        # End observability run
+        # End observability run (after the per-stage logs queued for it)
         if obs:
+            wait(obs_futures, timeout=OBS_FLUSH_TIMEOUT_SECONDS)
             try:
                 obs.end_agent_run(
                     response=answer or "",
@@ -207,13 +558,6 @@ def _async_audit_logging(
                 )
             except Exception as obs_error:
                 logger.info(f"⚠️ Error ending observability run: {obs_error}")
-                # Force end any active MLflow run
-                try:
-                    import mlflow
-                    if mlflow.active_run():
-                        mlflow.end_run()
-                except:
-                    pass
 
         logger.info(f"✅ Phase 8 (Audit Logging) completed in background")
 
@@ -227,20 +571,25 @@ def agent_query(
     country,
     query_string,
     validation_mode="llm_judge",
-    enable_observability=True
+    enable_observability=True,
+    enable_progress=True
 ):
     """
     Orchestrates one advisory query with LIVE PHASE TRACKING + OBSERVABILITY
     Shows phases dropdown with real-time updates as execution progresses
     Includes MLflow tracking and Lakehouse Monitoring integration
+    Headless callers (batch evals, CI) pass enable_progress=False to skip the UI tracker
     """
     
     # ✅ PROGRESS TRACKER - Initialization removed (handled in app.py inside expander)
     # Only reset is needed here to clear stale state
-    reset_progress_tracker()
+    if enable_progress:
+        reset_progress_tracker()
     # initialize_progress_tracker() - REMOVED: Was causing progress to render outside expander
     
-    start_all = time.time()
+    start_all_ns = time.perf_counter_ns()
+    # One governance event per call; both audit paths reuse it so the row is written once
+    event_id = str(uuid.uuid4())
     answer = None
     citations = None
     response_dict = {}
@@ -251,12 +600,14 @@ def agent_query(
     total_cost = 0.0
     cost_breakdown = {}
 
-    audit_logger = AuditLogger()
+    audit_logger = get_audit_logger()
     
     # ✅ INITIALIZE OBSERVABILITY (MLflow + Lakehouse Monitoring)
     obs = None
-    if enable_observability:
+    obs_futures = []
+    if enable_observability and MLFLOW_ENABLED:
         try:
+            from observability import create_observability
             obs = create_observability(enable_mlflow=True, enable_lakehouse=False)
             obs.start_agent_run(
                 session_id=session_id,
@@ -270,34 +621,29 @@ def agent_query(
             obs = None
     
     # Initialize orchestrator for phase tracking
-    orchestrator = AgentOrchestrator()
+    orchestrator = AgentOrchestrator(track_progress=enable_progress)
 
     try:
-        logger.info(f"\n{'='*70}")
-        logger.info(f"Running advisory pipeline")
-        logger.info(f"User: {user_id}")
-        logger.info(f"Session: {session_id}")
-        logger.info(f"Country: {country}")
-        logger.info(f"Query: {query_string}")
-        logger.info(f"Validation Mode: {validation_mode}")
-        logger.info(f"{'='*70}\n")
+        # One record per banner: a single handler/stdout write instead of eight
+        logger.info(
+            "\n%s\nRunning advisory pipeline\nUser: %s\nSession: %s\nCountry: %s"
+            "\nQuery: %s\nValidation Mode: %s\n%s\n",
+            _BANNER, user_id, session_id, country, query_string, validation_mode, _BANNER
+        )
 
         # PHASE 1: DATA RETRIEVAL
         with orchestrator.track_phase("Data Retrieval", "phase_1_retrieval"):
-            agent = SuperAdvisorAgent(validation_mode=validation_mode)
+            agent = get_agent(validation_mode)
             logger.info(f"✅ Agent initialized")
 
         phase1_duration = orchestrator.get_last_phase_duration()
 
         # PHASE 2: ANONYMIZATION
-        with orchestrator.track_phase("Privacy Anonymization", "phase_2_anonymization"):
-            logger.info(f"✓ Data anonymization ready")
-
-        phase2_duration = orchestrator.get_last_phase_duration()
+        phase2_duration = _mark_passthrough_phase(orchestrator, 'phase_2_anonymization')
         
         # ✅ CALL AGENT - This executes classification, tools, synthesis AND validation
         # Phase tracking happens INSIDE the ReAct loop
-        phase4_start = time.time()
+        phase4_start_ns = time.perf_counter_ns()
         
         result_dict = agent.process_query(
             member_id=user_id,
@@ -307,40 +653,42 @@ def agent_query(
         
         tools_called = result_dict.get('tools_used', [])
         
-        # ✅ LOG CLASSIFICATION TO OBSERVABILITY
+        # ✅ LOG CLASSIFICATION TO OBSERVABILITY (fire-and-forget; awaited before the run ends)
         if obs and 'classification' in result_dict:
-            obs.log_classification(result_dict['classification'])
+            obs_futures.append(_obs_executor.submit(obs.log_classification, result_dict['classification']))
         
         # ✅ LOG TOOL EXECUTION TO OBSERVABILITY
         tool_results_dict = result_dict.get('tool_results', {})
         if obs:
-            obs.log_tool_execution(tools_called, tool_results_dict or {})
+            obs_futures.append(_obs_executor.submit(obs.log_tool_execution, tools_called, tool_results_dict or {}))
         
         # Calculate ONLY tool execution time (subtract synthesis + validation)
-        phase4_total = time.time() - phase4_start
-        synthesis_results = result_dict.get('synthesis_results', [])
-        validation_results = result_dict.get('validation_results', [])
-        synthesis_time = sum(s.get('duration', 0) for s in synthesis_results)
-        validation_time = sum(v.get('duration', 0) for v in validation_results)
+        phase4_total = (time.perf_counter_ns() - phase4_start_ns) / 1e9
+        synthesis_results = result_dict.get('synthesis_results') or []
+        validation_results = result_dict.get('validation_results') or []
+        # One pass per list for every duration/token/cost aggregate used below
+        synthesis_totals = _aggregate_results(synthesis_results, 'claude-opus-4-1')
+        validation_totals = _aggregate_results(validation_results, 'claude-sonnet-4')
         
         # Phase 4 = total - synthesis - validation = pure tool/orchestration time
-        phase4_duration = phase4_total - synthesis_time - validation_time
+        phase4_duration = phase4_total - synthesis_totals.duration - validation_totals.duration
         
         logger.info(f"✓ Tools executed: {', '.join(tools_called) if tools_called else 'none'}")
         logger.info(f"⏱️  Phase 4 pure tool execution: {phase4_duration:.2f}s (excluding LLM time)")
-        mark_phase_complete('phase_4_execution', duration=phase4_duration)
+        if enable_progress:
+            mark_phase_complete('phase_4_execution', duration=phase4_duration)
         
         # PHASE 5: RESPONSE SYNTHESIS (Extract actual synthesis duration from results)
         logger.info("\n📍 PHASE 5: Response Synthesis")
-        mark_phase_running('phase_5_synthesis')
+        if enable_progress:
+            mark_phase_running('phase_5_synthesis')
         
         answer = result_dict.get('response', '')
         response_dict = result_dict
         citations = result_dict.get('citations', [])
-        synthesis_results = result_dict.get('synthesis_results', [])
         
-        # Calculate actual synthesis time from results
-        synthesis_duration = sum(s.get('duration', 0) for s in synthesis_results)
+        # Actual synthesis time from results
+        synthesis_duration = synthesis_totals.duration
         
         logger.info(f"✓ Response synthesized: {len(answer)} chars")
         logger.info(f"⏱️  Phase 5 actual synthesis time: {synthesis_duration:.2f}s")
@@ -350,15 +698,13 @@ def agent_query(
         
         # ✅ LOG SYNTHESIS TO OBSERVABILITY
         if obs:
-            obs.log_synthesis(synthesis_results)
+            obs_futures.append(_obs_executor.submit(obs.log_synthesis, synthesis_results))
         
         # PHASE 6: LLM VALIDATION (Extract actual validation duration from results)
         logger.info("\n📍 PHASE 6: LLM Validation")
         
-        validation_results = result_dict.get('validation_results', [])
-        
-        # Calculate actual validation time from results
-        validation_duration = sum(v.get('duration', 0) for v in validation_results)
+        # Actual validation time from results
+        validation_duration = validation_totals.duration
         
         if validation_results:
             final_validation = validation_results[-1]
@@ -371,6 +717,20 @@ def agent_query(
                 'validation_mode': validation_mode,
                 'attempts': len(validation_results)
             }
+        elif result_dict.get('cached'):
+            # Served from the result cache: report the verdict the answer was
+            # stored with, not a fresh deterministic pass
+            cached_validation = result_dict.get('validation') or {}
+            judge_verdict = {
+                'passed': cached_validation.get('passed', False),
+                'confidence': cached_validation.get('confidence', 0.0),
+                'verdict': 'Pass' if cached_validation.get('passed') else 'Fail',
+                'reasoning': cached_validation.get('reasoning', ''),
+                'violations': cached_validation.get('violations', []),
+                'validation_mode': validation_mode,
+                'attempts': result_dict.get('attempts', 0),
+                'cache_hit': True
+            }
         else:
             # No validation results (deterministic mode or error)
             judge_verdict = {
@@ -390,191 +750,163 @@ def agent_query(
         # This is just logging the final duration
 
         # PHASE 7: NAME RESTORATION
-        with orchestrator.track_phase("Name Restoration", "phase_7_restoration"):
-            logger.info(f"✓ Member name restored")
-
-        phase7_duration = orchestrator.get_last_phase_duration()
-
-        # 🆕 Calculate SYNTHESIS LLM costs
-        total_synthesis_input_tokens = sum(s.get('input_tokens', 0) for s in synthesis_results)
-        total_synthesis_output_tokens = sum(s.get('output_tokens', 0) for s in synthesis_results)
-        total_synthesis_cost = sum(s.get('cost', 0.0) for s in synthesis_results)
-
-        synthesis_model = synthesis_results[0].get('model', 'claude-opus-4-1') if synthesis_results else 'claude-opus-4-1'
-
-        cost_breakdown['synthesis'] = {
-            'input_tokens': total_synthesis_input_tokens,
-            'output_tokens': total_synthesis_output_tokens,
-            'cost': total_synthesis_cost,
-            'model': synthesis_model,
-            'attempts': len(synthesis_results)
-        }
-
-        logger.info(f"💰 Synthesis cost: ${total_synthesis_cost:.6f} ({synthesis_model})")
-        logger.info(f"   └─ {total_synthesis_input_tokens} input + {total_synthesis_output_tokens} output tokens across {len(synthesis_results)} attempt(s)")
-
-        # 🆕 Calculate VALIDATION LLM costs
-        total_validation_input_tokens = sum(v.get('input_tokens', 0) for v in validation_results)
-        total_validation_output_tokens = sum(v.get('output_tokens', 0) for v in validation_results)
-        total_validation_cost = sum(v.get('cost', 0.0) for v in validation_results)
-
-        validation_model = validation_results[0].get('model', 'claude-sonnet-4') if validation_results else 'claude-sonnet-4'
-
-        cost_breakdown['validation'] = {
-            'input_tokens': total_validation_input_tokens,
-            'output_tokens': total_validation_output_tokens,
-            'cost': total_validation_cost,
-            'model': validation_model,
-            'attempts': len(validation_results)
-        }
-
-        logger.info(f"💰 Validation cost: ${total_validation_cost:.6f} ({validation_model})")
-        logger.info(f"   └─ {total_validation_input_tokens} input + {total_validation_output_tokens} output tokens across {len(validation_results)} attempt(s)")
+        phase7_duration = _mark_passthrough_phase(orchestrator, 'phase_7_restoration')
+
+        # 🆕 SYNTHESIS + VALIDATION LLM costs (one section per aggregate)
+        for label, totals in (("Synthesis", synthesis_totals), ("Validation", validation_totals)):
+            cost_breakdown[label.lower()] = totals.as_cost_section()
+            logger.info(
+                "💰 %s cost: $%.6f (%s)\n   └─ %d input + %d output tokens across %d attempt(s)",
+                label, totals.cost, totals.model, totals.input_tokens,
+                totals.output_tokens, totals.attempts
+            )
 
         # 🆕 Calculate TOTAL COST
+        total_synthesis_cost = synthesis_totals.cost
+        total_validation_cost = validation_totals.cost
         total_cost = total_synthesis_cost + total_validation_cost
 
         cost_breakdown['total'] = {
             'synthesis_cost': total_synthesis_cost,
             'validation_cost': total_validation_cost,
             'total_cost': total_cost,
-            'synthesis_tokens': total_synthesis_input_tokens + total_synthesis_output_tokens,
-            'validation_tokens': total_validation_input_tokens + total_validation_output_tokens,
-            'total_tokens': (total_synthesis_input_tokens + total_synthesis_output_tokens +
-                           total_validation_input_tokens + total_validation_output_tokens)
+            'synthesis_tokens': synthesis_totals.tokens,
+            'validation_tokens': validation_totals.tokens,
+            'total_tokens': synthesis_totals.tokens + validation_totals.tokens
         }
 
-        elapsed = time.time() - start_all
-
-        logger.info(f"\n{'='*70}")
-        logger.info(f"✅ Query completed in {elapsed:.2f}s")
-        logger.info(f"💰 TOTAL COST: ${total_cost:.6f}")
-        logger.info(f"   ├─ Synthesis (Opus 4.1):  ${total_synthesis_cost:.6f}")
-        logger.info(f"   └─ Validation (Sonnet 4): ${total_validation_cost:.6f}")
-        logger.info(f"🔧 Tools used: {', '.join(tools_called)}")
-        logger.info(f"📊 Total tokens: {cost_breakdown['total']['total_tokens']:,}")
-        logger.info(f"\n⏱️  PHASE TIMING BREAKDOWN:")
-        logger.info(f"   Phase 1 (Retrieval):     {phase1_duration:.2f}s")
-        logger.info(f"   Phase 2 (Anonymization): {phase2_duration:.2f}s")
-        logger.info(f"   Phase 4 (Execution):     {phase4_duration:.2f}s")
-        logger.info(f"   Phase 5 (Synthesis):     {synthesis_duration:.2f}s (actual LLM time)")
-        logger.info(f"   Phase 6 (Validation):    {validation_duration:.2f}s (actual LLM time)")
-        logger.info(f"   Phase 7 (Restoration):   {phase7_duration:.2f}s")
-        logger.info(f"   Phase 8 (Logging):       (running in background...)")
-        logger.info(f"{'='*70}\n")
+        elapsed = (time.perf_counter_ns() - start_all_ns) / 1e9
+
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "\n%s\n✅ Query completed in %.2fs\n💰 TOTAL COST: $%.6f"
+                "\n   ├─ Synthesis (Opus 4.1):  $%.6f\n   └─ Validation (Sonnet 4): $%.6f"
+                "\n🔧 Tools used: %s\n📊 Total tokens: %s"
+                "\n\n⏱️  PHASE TIMING BREAKDOWN:"
+                "\n   Phase 1 (Retrieval):     %.2fs\n   Phase 2 (Anonymization): %.2fs"
+                "\n   Phase 4 (Execution):     %.2fs"
+                "\n   Phase 5 (Synthesis):     %.2fs (actual LLM time)"
+                "\n   Phase 6 (Validation):    %.2fs (actual LLM time)"
+                "\n   Phase 7 (Restoration):   %.2fs"
+                "\n   Phase 8 (Logging):       (running in background...)\n%s\n",
+                _BANNER, elapsed, total_cost, total_synthesis_cost, total_validation_cost,
+                ', '.join(tools_called), f"{cost_breakdown['total']['total_tokens']:,}",
+                phase1_duration, phase2_duration, phase4_duration,
+                synthesis_duration, validation_duration, phase7_duration, _BANNER
+            )
 
         # PHASE 8: AUDIT LOGGING (ASYNC - Non-blocking)
         # Extract classification method for async logging
         classification_info = result_dict.get('classification', {})
         classification_method = classification_info.get('method', 'unknown')
+        if result_dict.get('cached'):
+            classification_method = 'result_cache'
 
         # Mark Phase 8 as running
-        mark_phase_running('phase_8_logging')
-
-        # Start audit logging in background thread
-        audit_thread = threading.Thread(
-            target=_async_audit_logging,
-            args=(
-                audit_logger,
-                obs,
-                session_id,
-                user_id,
-                country,
-                query_string,
-                answer,
-                judge_verdict,
-                tools_called,
-                total_cost,
-                citations,
-                elapsed,
-                classification_method
-            ),
-            daemon=True  # Thread will not block program exit
+        if enable_progress:
+            mark_phase_running('phase_8_logging')
+
+        # Queue audit logging on the background pool (payloads snapshotted so
+        # the caller can mutate the returned structures safely)
+        _run_audit_task(
+            _async_audit_logging,
+            audit_logger,
+            obs,
+            session_id,
+            user_id,
+            country,
+            query_string,
+            answer,
+            dict(judge_verdict),
+            list(tools_called),
+            total_cost,
+            list(citations or []),
+            elapsed,
+            classification_method,
+            obs_futures,
+            event_id
         )
-        audit_thread.start()
 
         # Mark Phase 8 as complete immediately (logging continues in background)
-        mark_phase_complete('phase_8_logging', duration=0.0)
-        logger.info("🚀 Audit logging triggered (running in background)")
+        if enable_progress:
+            mark_phase_complete('phase_8_logging', duration=0.0)
+        if GOVERNANCE_SYNC_WRITES:
+            logger.info("✅ Audit logging completed (synchronous)")
+        else:
+            logger.info("🚀 Audit logging triggered (running in background)")
     
     except Exception as e:
+        # Format the traceback once; the log line and the audit row share it
         error_info = traceback.format_exc()
-        elapsed = time.time() - start_all
+        error_message = str(e)
+        elapsed = (time.perf_counter_ns() - start_all_ns) / 1e9
         
-        logger.error(f"\n❌ ERROR: {e}", exc_info=True)
+        logger.error("\n❌ ERROR: %s\n%s", error_message, error_info)
         
         # Mark current phase as error
-        mark_phase_error('phase_4_execution', str(e))
+        if enable_progress:
+            mark_phase_error('phase_4_execution', error_message)
+        
+        # Built once: recorded in the governance row and returned to the caller
+        judge_verdict = {
+            'verdict': 'ERROR',
+            'confidence': 0.0,
+            'passed': False,
+            'reasoning': f"Error: {error_message}",
+            'violations': [],
+            'validation_mode': validation_mode,
+            'attempts': 0
+        }
         
-        # Log error to governance table FIRST
-        audit_logger.log_to_governance_table(
+        # Queue the error row for the governance table (written in background)
+        _run_audit_task(
+            audit_logger.log_to_governance_table,
             session_id=session_id,
             user_id=user_id,
             country=country,
             query_string=query_string,
             answer="",
-            judge_verdict=error_judge_verdict,
-            tools_called=tools_called,
+            judge_verdict=dict(judge_verdict),
+            tools_called=list(tools_called),
             cost=0.0,
             citations=[],
             elapsed=elapsed,
             error_info=error_info,
-            classification_method='error'
+            classification_method='error',
+            event_id=event_id
         )
         
         # ✅ End observability run AFTER error logging (but BEFORE logger.log_to_mlflow)
         # This prevents duplicate MLflow runs
         if obs:
+            wait(obs_futures, timeout=OBS_FLUSH_TIMEOUT_SECONDS)
             try:
                 obs.end_agent_run(
                     response=answer or "Error occurred",
                     success=False,
-                    error=str(e)
+                    error=error_message
                 )
             except Exception as obs_error:
                 logger.info(f"⚠️ Error ending observability run: {obs_error}")
-                # Force end any active MLflow run
-                try:
-                    import mlflow
-                    if mlflow.active_run():
-                        mlflow.end_run(status="FAILED")
-                except:
-                    pass
         
         # ✅ SKIP logger.log_to_mlflow() - obs.end_agent_run() already logged to MLflow
         # This prevents "run already active" errors
         
-        judge_verdict = {
-            'verdict': 'ERROR',
-            'confidence': 0.0,
-            'passed': False,
-            'reasoning': f"Error: {str(e)}",
-            'violations': [],
-            'validation_mode': validation_mode,
-            'attempts': 0
-        }
-        
-        error_info = str(e)
+        error_info = error_message
     
     finally:
-        # ✅ CRITICAL: Only force end MLflow run if STILL active after all operations
-        # Don't end if obs.end_agent_run() already ended it
-        try:
-            import mlflow
-            if mlflow.active_run():
-                # Only end if obs didn't already end it
-                if obs and hasattr(obs, 'current_run') and obs.current_run:
-                    # obs still has a reference, but run is active - this shouldn't happen
-                    logger.info("⚠️ Found orphaned MLflow run, force ending...")
-                    mlflow.end_run()
-                    obs.current_run = None
-                elif not obs:
-                    # obs is None but run is active - end it
+        # ✅ obs owns its run's teardown (the error path above, or
+        # _async_audit_logging once its queued stage logs land), so only a run
+        # left open without obs needs force-ending here
+        if obs is None and MLFLOW_ENABLED:
+            try:
+                import mlflow
+                if mlflow.active_run():
                     logger.info("⚠️ Found active MLflow run without obs, force ending...")
                     mlflow.end_run()
-        except Exception as final_error:
-            # Silently ignore - don't break execution
-            pass
+            except Exception:
+                # Silently ignore - don't break execution
+                pass
     
     # Return structured response
     return {
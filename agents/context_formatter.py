@@ -28,13 +28,34 @@ Date: 2024-11-24
 """
 
 import hashlib
+import io
 import re
+from functools import lru_cache
 from typing import Dict, Any, Optional, List, Tuple
 
 from utils.formatting import get_currency, get_currency_symbol, safe_float
 from country_config import get_authority
 from shared.logging_config import get_logger
 
+# Section separators used by format_tool_results
+SEP_EQ = "=" * 70
+SEP_DASH = "-" * 40
+
+_COUNTRY_RE = re.compile(r"Country: ([A-Z]{2})")
+_GREETING_RE = re.compile(r"\s*(?:Hi|Hello|Dear)")
+
+
+def has_greeting(text: str) -> bool:
+    """Return True if ``text`` already opens with a greeting (no stripped copy)."""
+    return _GREETING_RE.match(text) is not None
+
+
+@lru_cache(maxsize=1024)
+def _anon_name(name: str) -> str:
+    """Hash a member name into its stable anonymized alias (memoized)."""
+    # 3-byte digest is exactly the 6 hex chars of the alias (no full-digest slice)
+    return f"Member_{hashlib.blake2b(name.encode('utf-8'), digest_size=3).hexdigest()}"
+
 
 class ContextFormatter:
     """
@@ -44,6 +65,17 @@ class ContextFormatter:
         logger: Logger instance for structured logging
     """
 
+    # Member profile templates, built once at class load
+    _CTX_TEMPLATE_DEFAULT = (
+        "Member Profile:\n"
+        "- Name: {display_name}\n"
+        "- Age: {age}\n"
+        "- Country: {country}\n"
+        "- Employment: {employment}\n"
+        "- Retirement Corpus: {balance:,.2f} {currency}\n"
+    )
+    _CTX_TEMPLATE_AU = _CTX_TEMPLATE_DEFAULT + "- Preservation Age: {pres_age}\n"
+
     def __init__(self, logger=None):
         """
         Initialize context formatter.
@@ -55,7 +87,7 @@ class ContextFormatter:
 
     def anonymize_member_name(self, name: str) -> str:
         """
-        Anonymize member name for privacy using MD5 hash.
+        Anonymize member name for privacy using a short BLAKE2b hash.
 
         Args:
             name: Member's real name
@@ -72,10 +104,9 @@ class ContextFormatter:
         if not name or name == "Unknown Member":
             return "Member_unknown"
 
-        name_hash = hashlib.md5(name.encode()).hexdigest()[:6]
-        anonymized = f"Member_{name_hash}"
+        anonymized = _anon_name(name)
 
-        self.logger.debug(f"Anonymized '{name}' → '{anonymized}'")
+        self.logger.debug("Anonymized '%s' → '%s'", name, anonymized)
         return anonymized
 
     def restore_member_name(
@@ -106,11 +137,12 @@ class ContextFormatter:
         if not anonymized_name or not real_name:
             return text
 
-        if anonymized_name in text:
-            text = text.replace(anonymized_name, real_name)
-            self.logger.debug(f"Restored name: {anonymized_name} → {real_name}")
+        # Single C-level pass; replace() hands back the same object when absent
+        restored = text.replace(anonymized_name, real_name)
+        if restored is not text:
+            self.logger.debug("Restored name: %s → %s", anonymized_name, real_name)
 
-        return text
+        return restored
 
     def add_personalized_greeting(
         self,
@@ -137,7 +169,7 @@ class ContextFormatter:
             return text
 
         # Check if greeting already exists
-        if text.strip().startswith(("Hi", "Hello", "Dear")):
+        if has_greeting(text):
             return text
 
         greeting = f"Hi {member_name},\n\n{text}"
@@ -161,11 +193,11 @@ class ContextFormatter:
             >>> country = formatter.get_country_from_context(context)
             >>> assert country == "US"
         """
-        country_match = re.search(r"Country: ([A-Z]{2})", context)
+        country_match = _COUNTRY_RE.search(context)
 
         if country_match:
             country = country_match.group(1)
-            self.logger.debug(f"Extracted country: {country}")
+            self.logger.debug("Extracted country: %s", country)
             return country
 
         self.logger.debug("No country found in context, defaulting to AU")
@@ -188,6 +220,8 @@ class ContextFormatter:
                 - text: Formatted context string
                 - real_name: Member's real name
                 - anonymized_name: Anonymized name (if anonymize=True)
+                - needs_restore: True when the response text must have the
+                  real name restored (anonymized and different from real)
 
         Examples:
             >>> formatter = ContextFormatter()
@@ -207,7 +241,7 @@ class ContextFormatter:
 
         if anonymize:
             display_name = self.anonymize_member_name(real_name)
-            self.logger.info(f"🔒 Privacy Mode: Anonymized '{real_name}' → '{display_name}'")
+            self.logger.info("🔒 Privacy Mode: Anonymized '%s' → '%s'", real_name, display_name)
         else:
             display_name = real_name
 
@@ -219,26 +253,32 @@ class ContextFormatter:
 
         currency = get_currency(country)
 
-        context = f"""Member Profile:
-- Name: {display_name}
-- Age: {age}
-- Country: {country}
-- Employment: {employment}
-- Retirement Corpus: {balance:,.2f} {currency}
-"""
-
-        # Add country-specific fields
+        # Country-specific fields live in the template, so one format call builds the text
         if country == "AU":
+            template = self._CTX_TEMPLATE_AU
             pres_age = member_profile.get("preservation_age", "Unknown")
-            context += f"- Preservation Age: {pres_age}\n"
+        else:
+            template = self._CTX_TEMPLATE_DEFAULT
+            pres_age = None
+
+        context = template.format(
+            display_name=display_name,
+            age=age,
+            country=country,
+            employment=employment,
+            balance=balance,
+            currency=currency,
+            pres_age=pres_age
+        )
 
         context_data = {
             "text": context,
             "real_name": real_name,
-            "anonymized_name": display_name if anonymize else None
+            "anonymized_name": display_name if anonymize else None,
+            "needs_restore": anonymize and display_name != real_name
         }
 
-        self.logger.debug(f"Built base context for {country} member")
+        self.logger.debug("Built base context for %s member", country)
         return context_data
 
     def format_tool_results(
@@ -274,17 +314,18 @@ class ContextFormatter:
         if not tool_results:
             return ""
 
-        result_lines = ["=" * 70]
-        result_lines.append("UC FUNCTION RESULTS:")
-        result_lines.append("=" * 70)
+        buf = io.StringIO()
+        write = buf.write
+        write(SEP_EQ)
+        write("\nUC FUNCTION RESULTS:\n")
+        write(SEP_EQ)
 
         for tool_name, results in tool_results.items():
-            result_lines.append(f"\n{tool_name.upper()} RESULTS:")
-            result_lines.append("-" * 40)
+            write(f"\n\n{tool_name.upper()} RESULTS:\n{SEP_DASH}")
 
             if isinstance(results, dict):
                 if "error" in results:
-                    result_lines.append(f"❌ Error: {results['error']}")
+                    write(f"\n❌ Error: {results['error']}")
                     self.logger.warning(f"Tool {tool_name} returned error: {results['error']}")
                     continue
 
@@ -295,27 +336,31 @@ class ContextFormatter:
                 if not authority:
                     authority = get_authority(country, tool_name)
 
-                result_lines.append(f"Tool: {tool_name_display}")
-                result_lines.append(f"Authority: {authority}")
+                write(f"\nTool: {tool_name_display}\nAuthority: {authority}")
 
                 # Special handling for India balance split
                 if "balance_split" in results:
                     split = results["balance_split"]
-                    result_lines.append(f"Total Balance: {split['total_balance']:,.2f} INR")
-                    result_lines.append(f"EPF Balance: {split['epf_balance']:,.2f} INR (75%)")
-                    result_lines.append(f"NPS Balance: {split['nps_balance']:,.2f} INR (25%)")
+                    write(
+                        f"\nTotal Balance: {split['total_balance']:,.2f} INR"
+                        f"\nEPF Balance: {split['epf_balance']:,.2f} INR (75%)"
+                        f"\nNPS Balance: {split['nps_balance']:,.2f} INR (25%)"
+                    )
                     self.logger.debug("Added India EPF/NPS balance split to formatting")
 
                 if "calculation_note" in results:
-                    result_lines.append(f"Note: {results['calculation_note']}")
+                    write(f"\nNote: {results['calculation_note']}")
 
-                result_lines.append(f"Calculation: {str(calculation)[:300]}")
+                if not isinstance(calculation, str):
+                    calculation = str(calculation)
+                write(f"\nCalculation: {calculation[:300]}")
             else:
-                result_lines.append(f"Result: {str(results)[:200]}")
+                write(f"\nResult: {str(results)[:200]}")
 
-        result_lines.append("=" * 70)
+        write("\n")
+        write(SEP_EQ)
 
-        formatted = "\n".join(result_lines)
+        formatted = buf.getvalue()
         self.logger.debug(f"Formatted {len(tool_results)} tool results")
 
         return formatted
@@ -67,8 +67,15 @@ class AgentOrchestrator:
         >>> print(timings)  # {'phase_1_retrieval': 1.23, ...}
     """
 
-    def __init__(self):
-        """Initialize orchestrator with empty timing storage."""
+    def __init__(self, track_progress: bool = True):
+        """
+        Initialize orchestrator with empty timing storage.
+
+        Args:
+            track_progress: Report phases to the UI progress tracker (default: True).
+                Headless runs pass False; timings are still recorded.
+        """
+        self.track_progress = track_progress
         self._phase_timings: Dict[str, float] = {}
         self._last_phase_key: Optional[str] = None
 
@@ -98,29 +105,32 @@ class AgentOrchestrator:
             - Automatically calls mark_phase_running() on entry
             - Automatically calls mark_phase_complete() on exit
             - Automatically calls mark_phase_error() on exception
+            - The mark_phase_* calls are skipped when track_progress is False
             - Exception is re-raised after marking error
         """
         # Log phase banner
         if print_banner:
             logger.info(f"📍 {phase_name}")
 
-        # Start timing
-        start_time = time.time()
+        # Start timing (monotonic, immune to wall-clock adjustments)
+        start_ns = time.perf_counter_ns()
 
         # Mark phase as running
-        mark_phase_running(phase_key)
+        if self.track_progress:
+            mark_phase_running(phase_key)
 
         try:
             # Execute phase logic
             yield
 
             # Calculate duration
-            duration = time.time() - start_time
+            duration = (time.perf_counter_ns() - start_ns) / 1e9
             self._phase_timings[phase_key] = duration
             self._last_phase_key = phase_key
 
             # Mark phase as complete
-            mark_phase_complete(phase_key, duration=duration)
+            if self.track_progress:
+                mark_phase_complete(phase_key, duration=duration)
 
             # Log timing
             if print_banner:
@@ -128,12 +138,13 @@ class AgentOrchestrator:
 
         except Exception as e:
             # Calculate duration up to error
-            duration = time.time() - start_time
+            duration = (time.perf_counter_ns() - start_ns) / 1e9
             self._phase_timings[phase_key] = duration
             self._last_phase_key = phase_key
 
             # Mark phase as error
-            mark_phase_error(phase_key, str(e))
+            if self.track_progress:
+                mark_phase_error(phase_key, str(e))
 
             # Log error info
             if print_banner:
@@ -245,7 +256,7 @@ def track_phase(phase_name: str, phase_key: str, print_banner: bool = True) -> G
         logger.info(f"📍 {phase_name}")
 
     # Start timing
-    start_time = time.time()
+    start_ns = time.perf_counter_ns()
 
     # Mark phase as running
     mark_phase_running(phase_key)
@@ -255,7 +266,7 @@ def track_phase(phase_name: str, phase_key: str, print_banner: bool = True) -> G
         yield
 
         # Calculate duration
-        duration = time.time() - start_time
+        duration = (time.perf_counter_ns() - start_ns) / 1e9
 
         # Mark phase as complete
         mark_phase_complete(phase_key, duration=duration)
@@ -266,7 +277,7 @@ def track_phase(phase_name: str, phase_key: str, print_banner: bool = True) -> G
 
     except Exception as e:
         # Calculate duration up to error
-        duration = time.time() - start_time
+        duration = (time.perf_counter_ns() - start_ns) / 1e9
 
         # Mark phase as error
         mark_phase_error(phase_key, str(e))
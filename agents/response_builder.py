@@ -36,7 +36,6 @@ Date: 2024-11-24
 """
 
 import time
-import traceback
 from typing import Dict, Any, Optional
 from dataclasses import dataclass
 
@@ -47,13 +46,43 @@ from config import (
     MAIN_LLM_ENDPOINT,
     MAIN_LLM_TEMPERATURE,
     MAIN_LLM_MAX_TOKENS,
-    calculate_llm_cost
+    calculate_llm_cost,
+    detect_model_type
 )
 from country_config import get_country_config, get_balance_terminology
 from prompts.template_manager import get_template_manager
 from agents.context_formatter import ContextFormatter
+from shared.cache import TTLCache, make_cache_key
 from shared.logging_config import get_logger
 
+# Optional exact tokenizer (only used when exact_token_counts=True)
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    tiktoken = None
+    TIKTOKEN_AVAILABLE = False
+
+# Rough heuristic used when the endpoint reports no usage: 1 token ≈ 4 chars
+CHARS_PER_TOKEN = 4
+
+
+def estimate_token_count(*parts: str) -> int:
+    """
+    Estimate tokens across several prompt parts without concatenating them.
+
+    Args:
+        *parts: Prompt fragments (system prompt, context, ...)
+
+    Returns:
+        Estimated token count
+
+    Examples:
+        >>> estimate_token_count("A" * 400, "B" * 600)
+        250
+    """
+    return sum(map(len, parts)) // CHARS_PER_TOKEN
+
 
 @dataclass
 class ResponseResult:
@@ -64,6 +93,7 @@ class ResponseResult:
     cost: float
     duration: float
     error: Optional[str] = None
+    cached: bool = False
 
 
 class ResponseGenerationError(Exception):
@@ -82,6 +112,7 @@ class ResponseBuilder:
         logger: Logger instance for structured logging
         template_manager: Template manager for prompts
         context_formatter: Context formatter for tool results
+        response_cache: TTL cache of successful syntheses (None if disabled)
     """
 
     def __init__(
@@ -91,7 +122,11 @@ class ResponseBuilder:
         model_type: str = "claude-sonnet-4",
         temperature: float = MAIN_LLM_TEMPERATURE,
         max_tokens: int = MAIN_LLM_MAX_TOKENS,
-        logger=None
+        logger=None,
+        enable_cache: bool = True,
+        cache_maxsize: int = 512,
+        cache_ttl: float = 3600.0,
+        exact_token_counts: bool = False
     ):
         """
         Initialize response builder.
@@ -103,6 +138,11 @@ class ResponseBuilder:
             temperature: LLM temperature setting
             max_tokens: Maximum tokens for response
             logger: Optional logger instance (creates default if None)
+            enable_cache: Cache syntheses keyed by query, context and tool results
+            cache_maxsize: Maximum number of cached syntheses
+            cache_ttl: Lifetime of a cached synthesis in seconds
+            exact_token_counts: Use tiktoken (if installed) instead of the
+                4-chars-per-token heuristic when the endpoint omits usage
         """
         self.workspace_client = workspace_client or WorkspaceClient()
         self.llm_endpoint = llm_endpoint or MAIN_LLM_ENDPOINT
@@ -115,6 +155,22 @@ class ResponseBuilder:
         self.template_manager = get_template_manager()
         self.context_formatter = ContextFormatter(logger=self.logger)
 
+        self.exact_token_counts = exact_token_counts
+        self._encoder = None  # Lazily created tiktoken encoding
+
+        # Per-country (balance_term, note) used by _update_context_terminology
+        self._terminology_rewrites: Dict[str, tuple] = {}
+
+        # Rendered system prompt per country (see reload_prompts)
+        self._system_prompt_by_country: Dict[str, str] = {}
+
+        # Last (key, system_prompt, full_context) built; validation retries of the
+        # same query reuse it instead of re-rendering the prompt per attempt
+        self._last_prompt: Optional[tuple] = None
+
+        # Content-addressed synthesis cache (identical query + context + tools)
+        self.response_cache = TTLCache(maxsize=cache_maxsize, ttl=cache_ttl) if enable_cache else None
+
         self.logger.info(
             f"ResponseBuilder initialized: endpoint={self.llm_endpoint}, "
             f"model={self.model_type}, temp={self.temperature}"
@@ -130,16 +186,7 @@ class ResponseBuilder:
         Returns:
             Model type string for cost calculation
         """
-        endpoint_lower = endpoint.lower()
-
-        if "opus" in endpoint_lower:
-            return "claude-opus-4-1"
-        elif "sonnet" in endpoint_lower:
-            return "claude-sonnet-4"
-        elif "haiku" in endpoint_lower:
-            return "claude-haiku-4"
-        else:
-            return "claude-sonnet-4"  # Default
+        return detect_model_type(endpoint)
 
     def _build_system_prompt(
         self,
@@ -158,8 +205,11 @@ class ResponseBuilder:
         Returns:
             Complete system prompt string
         """
-        # Get system prompt from template
-        system_prompt_base = self.template_manager.render_system_prompt(country)
+        # Get system prompt from template (rendered once per country)
+        system_prompt_base = self._system_prompt_by_country.get(country)
+        if system_prompt_base is None:
+            system_prompt_base = self.template_manager.render_system_prompt(country)
+            self._system_prompt_by_country[country] = system_prompt_base
 
         # Build complete system prompt
         system_prompt = f"""{system_prompt_base}
@@ -173,6 +223,65 @@ USER QUESTION:
 
         return system_prompt
 
+    def _build_prompt(
+        self,
+        user_query: str,
+        context: str,
+        tool_results: Dict[str, Any],
+        country: str,
+        tool_context: Optional[str] = None
+    ) -> tuple:
+        """
+        Build the (system_prompt, full_context) pair sent to the LLM.
+
+        When ``tool_context`` is supplied (as the ReAct loop does), the result
+        is remembered so validation retries of the same query skip the
+        terminology rewrite and prompt rendering.
+
+        Args:
+            user_query: User's query
+            context: Member context string
+            tool_results: Dictionary of tool execution results
+            country: Country code
+            tool_context: Pre-formatted tool results, if available
+
+        Returns:
+            Tuple of (system_prompt, full_context)
+        """
+        key = (country, user_query, context, tool_context) if tool_context is not None else None
+        last = self._last_prompt
+        if key is not None and last is not None and last[0] == key:
+            return last[1], last[2]
+
+        # Update context with country-specific terminology
+        context = self._update_context_terminology(context, country)
+
+        # Build system prompt
+        system_prompt = self._build_system_prompt(country, context, user_query)
+
+        # Format tool results (unless the caller already did) and build full context
+        if tool_context is None:
+            tool_context = self.context_formatter.format_tool_results(tool_results, country)
+        full_context = f"{context}\n\n{tool_context}"
+
+        if key is not None:
+            self._last_prompt = (key, system_prompt, full_context)
+        return system_prompt, full_context
+
+    def reload_prompts(self) -> None:
+        """
+        Drop rendered system prompts so updated templates take effect.
+
+        Also clears the template manager's render cache and the synthesis
+        cache, since cached responses were produced with the old prompts.
+        """
+        self._system_prompt_by_country.clear()
+        self._last_prompt = None
+        self.template_manager.clear_cache()
+        if self.response_cache is not None:
+            self.response_cache.clear()
+        self.logger.info("🔄 System prompts reloaded")
+
     def _update_context_terminology(
         self,
         context: str,
@@ -188,15 +297,19 @@ USER QUESTION:
         Returns:
             Updated context with proper terminology
         """
-        config = get_country_config(country)
-        balance_term = get_balance_terminology(country)
+        # Single substring scan; config lookups only when a rewrite is needed
+        if "superbalance" not in context:
+            return context
 
-        # Replace generic terms with country-specific
-        if "superbalance" in context:
-            context = context.replace("superbalance", balance_term)
-            context += f"\nNote: {balance_term} refers to the member's {config.retirement_account_term} balance."
+        rewrite = self._terminology_rewrites.get(country)
+        if rewrite is None:
+            config = get_country_config(country)
+            balance_term = get_balance_terminology(country)
+            note = f"\nNote: {balance_term} refers to the member's {config.retirement_account_term} balance."
+            rewrite = self._terminology_rewrites[country] = (balance_term, note)
 
-        return context
+        balance_term, note = rewrite
+        return context.replace("superbalance", balance_term) + note
 
     def _extract_response_text(self, response: Any) -> str:
         """
@@ -244,6 +357,8 @@ USER QUESTION:
         """
         Estimate token usage when not available from API.
 
+        Only called when the endpoint response carries no usage block.
+
         Args:
             system_prompt: System prompt text
             full_context: Full context text
@@ -251,8 +366,12 @@ USER QUESTION:
         Returns:
             Tuple of (estimated_input_tokens, estimated_output_tokens)
         """
-        # Rough estimate: 1 token ≈ 4 characters
-        input_tokens = len(system_prompt + full_context) // 4
+        if self.exact_token_counts and TIKTOKEN_AVAILABLE:
+            if self._encoder is None:
+                self._encoder = tiktoken.get_encoding("cl100k_base")
+            input_tokens = len(self._encoder.encode(system_prompt)) + len(self._encoder.encode(full_context))
+        else:
+            input_tokens = estimate_token_count(system_prompt, full_context)
         output_tokens = 150  # Default estimate
 
         self.logger.debug(f"Estimated tokens: {input_tokens} input + {output_tokens} output")
@@ -264,20 +383,29 @@ USER QUESTION:
         context: str,
         tool_results: Dict[str, Any],
         country: str,
-        validation_history: Optional[list] = None
+        validation_history: Optional[list] = None,
+        tool_context: Optional[str] = None
     ) -> ResponseResult:
         """
         Generate AI response using ChatMessage objects with token tracking.
 
+        First attempts are served from the synthesis cache when the same
+        (user_query, context, tool_results, country) was answered recently.
+        Retries (non-empty validation_history) always call the LLM so that
+        validation feedback gets a fresh sample.
+
         Args:
             user_query: User's query
             context: Member context string
             tool_results: Dictionary of tool execution results
             country: Country code (AU, US, UK, IN)
             validation_history: Optional validation history (not currently used)
+            tool_context: Pre-formatted tool results. Retry loops pass this so
+                tool_results is formatted once per query, not per attempt
 
         Returns:
             ResponseResult with response text, tokens, cost, and duration
+            (cache hits report zero tokens/cost and ``cached=True``)
 
         Examples:
             >>> builder = ResponseBuilder()
@@ -292,16 +420,26 @@ USER QUESTION:
         """
         start_time = time.time()
 
-        try:
-            # Update context with country-specific terminology
-            context = self._update_context_terminology(context, country)
-
-            # Build system prompt
-            system_prompt = self._build_system_prompt(country, context, user_query)
+        cache_key = None
+        if self.response_cache is not None and not validation_history:
+            cache_key = make_cache_key(user_query, context, tool_results, country)
+            cached_text = self.response_cache.get(cache_key)
+            if cached_text is not None:
+                elapsed = time.time() - start_time
+                self.logger.info(f"💾 Synthesis cache hit: {len(cached_text)} chars")
+                return ResponseResult(
+                    text=cached_text,
+                    input_tokens=0,
+                    output_tokens=0,
+                    cost=0.0,
+                    duration=elapsed,
+                    cached=True
+                )
 
-            # Format tool results and build full context
-            tool_context = self.context_formatter.format_tool_results(tool_results, country)
-            full_context = f"{context}\n\n{tool_context}"
+        try:
+            system_prompt, full_context = self._build_prompt(
+                user_query, context, tool_results, country, tool_context
+            )
 
             # Build messages
             messages = [
@@ -337,6 +475,9 @@ USER QUESTION:
 
             self.logger.info(f"✅ LLM response: {len(response_text)} chars in {elapsed:.2f}s")
 
+            if cache_key is not None:
+                self.response_cache.set(cache_key, response_text)
+
             return ResponseResult(
                 text=response_text,
                 input_tokens=input_tokens,
@@ -348,8 +489,7 @@ USER QUESTION:
         except Exception as e:
             elapsed = time.time() - start_time
             error_msg = f"Error generating response: {e}"
-            self.logger.error(f"❌ {error_msg}")
-            traceback.print_exc()
+            self.logger.exception("❌ %s", error_msg)
 
             # Return error response
             return ResponseResult(
@@ -439,7 +579,6 @@ if __name__ == "__main__":
         logger.info(f"  Estimated: {input_est} input + {output_est} output")
 
     except Exception as e:
-        logger.info(f"✗ Error: {e}")
-        traceback.print_exc()
+        logger.exception("✗ Error: %s", e)
 
     logger.info("\n" + "=" * 70)
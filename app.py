@@ -25,6 +25,7 @@ from utils.progress import initialize_progress_tracker
 from agent_processor import agent_query
 from utils.lakehouse import get_members_by_country
 from country_content import COUNTRY_PROMPTS, COUNTRY_DISCLAIMERS
+from shared.logging_config import setup_logging
 
 # ============================================================================ #
 # CONFIGURATION & SESSION SETUP
@@ -37,6 +38,17 @@ st.set_page_config(
     initial_sidebar_state="expanded",
 )
 
+
+@st.cache_resource
+def configure_logging():
+    """Configure logging once per server process (Streamlit reruns this script)."""
+    # Queue-backed: request threads hand records off instead of writing
+    # stdout/file themselves; the listener is flushed and stopped at exit
+    setup_logging(non_blocking=True)
+
+
+configure_logging()
+
 # Session state initialization
 if "page" not in st.session_state:
     st.session_state.page = "Advisory"
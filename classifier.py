@@ -11,6 +11,7 @@ Replaces hardcoded keywords + ai_classify with semantic understanding
 import time
 import re
 import json
+import operator
 from typing import Dict, List, Optional
 from databricks.sdk import WorkspaceClient
 from databricks.sdk.service.sql import StatementState
@@ -18,6 +19,13 @@ from databricks.sdk.service.serving import ChatMessage, ChatMessageRole
 
 from config import SQL_WAREHOUSE_ID
 from utils.lakehouse import get_workspace_client  # Use same workspace client as member cards
+from shared.cache import TTLCache, make_cache_key, unit_vector
+
+# Normalized archetype embeddings, shared by every classifier in the process.
+# Agents (and their classifiers) are built per request, so without this the
+# archetype set would be re-embedded by the first Stage 2 query of each one.
+ARCHETYPE_CACHE_TTL_SECONDS = 24 * 3600
+_archetype_cache = TTLCache(maxsize=8, ttl=ARCHETYPE_CACHE_TTL_SECONDS)
 
 
 class EmbeddingCascadeClassifier:
@@ -54,6 +62,9 @@ class EmbeddingCascadeClassifier:
         # Query cache
         self.cache = {} if enable_cache else None
         
+        # Query embeddings, shared between Stage 2 and the agent's semantic cache
+        self._embedding_cache = TTLCache(maxsize=1024, ttl=3600.0)
+        
         # Archetype embeddings (computed on first use)
         self._retirement_embeddings = None
         self._off_topic_embeddings = None
@@ -62,6 +73,9 @@ class EmbeddingCascadeClassifier:
         self.HIGH_CONFIDENCE_THRESHOLD = 0.75
         self.LOW_CONFIDENCE_THRESHOLD = 0.40
         
+        # Queries shorter than this cannot match any pattern or keyword
+        self.MIN_QUERY_LENGTH = 3
+        
         # Metrics
         self.metrics = {
             'total_queries': 0,
@@ -78,12 +92,13 @@ class EmbeddingCascadeClassifier:
         logger.info(f"   LLM Fallback: {self.llm_endpoint}")
         logger.info(f"   Cache Enabled: {self.enable_cache}")
     
-    def classify(self, user_query: str) -> Dict:
+    def classify(self, user_query: str, query_lower: Optional[str] = None) -> Dict:
         """
         Main classification method with 3-stage cascade.
         
         Args:
             user_query: User's query to classify
+            query_lower: Pre-computed ``user_query.casefold()`` (computed here if omitted)
             
         Returns:
             Classification result dictionary with:
@@ -105,8 +120,23 @@ class EmbeddingCascadeClassifier:
             result['latency_ms'] = 0.0
             return result
         
+        if query_lower is None:
+            query_lower = user_query.casefold()
+        
+        # Too short to classify - default to on-topic without any model calls
+        if len(query_lower.strip()) < self.MIN_QUERY_LENGTH:
+            return {
+                'is_on_topic': True,
+                'confidence': 0.0,
+                'classification': 'too_short',
+                'method': 'short_query',
+                'latency_ms': 0.0,
+                'cost_usd': 0.0,
+                'cached': False
+            }
+        
         # STAGE 1: Regex pattern matching (fast path)
-        stage1_result = self._stage1_regex_classification(user_query)
+        stage1_result = self._stage1_regex_classification(user_query, query_lower)
         if stage1_result is not None:
             self.metrics['stage1_hits'] += 1
             latency_ms = (time.time() - start_time) * 1000
@@ -154,13 +184,14 @@ class EmbeddingCascadeClassifier:
         self._update_metrics(result)
         return result
     
-    def _stage1_regex_classification(self, query: str) -> Optional[Dict]:
+    def _stage1_regex_classification(self, query: str, query_lower: Optional[str] = None) -> Optional[Dict]:
         """
         Stage 1: Fast regex pattern matching.
         
         Returns None if no definitive match found.
         """
-        query_lower = query.lower()
+        if query_lower is None:
+            query_lower = query.casefold()
         
         # High-precision retirement patterns
         # ✅ FIXED: Patterns now match word order flexibly
@@ -240,25 +271,16 @@ class EmbeddingCascadeClassifier:
         """
         try:
             # Get query embedding
-            query_embedding = self._get_embedding(query)
+            query_embedding = self.embed(query)
             
             # Ensure archetypes are loaded
             if self._retirement_embeddings is None:
                 self._load_archetype_embeddings()
             
-            # Calculate similarity to retirement archetypes
-            retirement_scores = [
-                self._cosine_similarity(query_embedding, arch_emb)
-                for arch_emb in self._retirement_embeddings
-            ]
-            max_retirement_score = max(retirement_scores) if retirement_scores else 0.0
-            
-            # Calculate similarity to off-topic archetypes
-            off_topic_scores = [
-                self._cosine_similarity(query_embedding, arch_emb)
-                for arch_emb in self._off_topic_embeddings
-            ]
-            max_off_topic_score = max(off_topic_scores) if off_topic_scores else 0.0
+            # Archetypes are stored unit-length, so each score is one dot product
+            query_unit = unit_vector(query_embedding) or []
+            max_retirement_score = self._max_similarity(query_unit, self._retirement_embeddings)
+            max_off_topic_score = self._max_similarity(query_unit, self._off_topic_embeddings)
             
             # High confidence retirement query
             if max_retirement_score > self.HIGH_CONFIDENCE_THRESHOLD:
@@ -383,6 +405,22 @@ Respond in JSON:
                 'error': str(e)
             }
     
+    def embed(self, text: str) -> List[float]:
+        """
+        Get the embedding for ``text``, memoized per exact text.
+        
+        Args:
+            text: Text to embed
+            
+        Returns:
+            Embedding vector
+        """
+        embedding = self._embedding_cache.get(text)
+        if embedding is None:
+            embedding = self._get_embedding(text)
+            self._embedding_cache.set(text, embedding)
+        return embedding
+    
     def _get_embedding(self, text: str) -> List[float]:
         """
         Get embedding vector using Databricks AI functions.
@@ -468,17 +506,40 @@ Respond in JSON:
                 "Help me reset my password",
             ]
         
-        # Compute embeddings
-        self._retirement_embeddings = [
-            self._get_embedding(arch) for arch in retirement_archetypes
-        ]
+        # Reuse embeddings another classifier already computed for the same set
+        cache_key = make_cache_key(self.embedding_model, retirement_archetypes, off_topic_archetypes)
+        cached = _archetype_cache.get(cache_key)
+        if cached is not None:
+            self._retirement_embeddings, self._off_topic_embeddings = cached
+            logger.debug("💾 Archetype embeddings reused from process cache")
+            return
         
-        self._off_topic_embeddings = [
-            self._get_embedding(arch) for arch in off_topic_archetypes
-        ]
+        # Compute embeddings, normalized once so per-query scoring skips the norms
+        self._retirement_embeddings = self._unit_embeddings(retirement_archetypes)
+        self._off_topic_embeddings = self._unit_embeddings(off_topic_archetypes)
+        _archetype_cache.set(cache_key, (self._retirement_embeddings, self._off_topic_embeddings))
         
         logger.info(f"✅ Loaded {len(self._retirement_embeddings)} retirement + {len(self._off_topic_embeddings)} off-topic archetypes")
     
+    def _unit_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """Embed ``texts`` and scale each vector to unit length (zero vectors dropped)."""
+        vectors = (unit_vector(self._get_embedding(text)) for text in texts)
+        return [vector for vector in vectors if vector is not None]
+    
+    @staticmethod
+    def _max_similarity(query_unit: List[float], unit_vectors: List[List[float]]) -> float:
+        """
+        Highest cosine similarity between a unit query and unit archetype vectors.
+        
+        Returns 0.0 when there is nothing to compare against.
+        """
+        if not query_unit:
+            return 0.0
+        return max(
+            (sum(map(operator.mul, query_unit, vector)) for vector in unit_vectors),
+            default=0.0
+        )
+    
     def _cosine_similarity(self, vec1: List[float], vec2: List[float]) -> float:
         """
         Calculate cosine similarity between two vectors.
@@ -59,6 +59,9 @@ MEMBER_PROFILES_TABLE = _config['databricks']['member_profiles_table']
 # ============================================================================
 MLFLOW_PROD_EXPERIMENT_PATH = _config['mlflow']['prod_experiment_path']
 MLFLOW_OFFLINE_EVAL_PATH = _config['mlflow']['offline_eval_path']
+# Set MLFLOW_DISABLED=1 to skip all per-query tracking; the agent pipeline then
+# never imports mlflow (the Streamlit dashboards still do)
+MLFLOW_ENABLED = os.environ.get("MLFLOW_DISABLED") != "1"
 
 # ============================================================================
 # Brand Configuration
@@ -92,6 +95,13 @@ LLM_PRICING = {
     }
 }
 
+# (input, output) USD per 1M tokens, flattened from LLM_PRICING for calculate_llm_cost
+_PRICES = {
+    model: (pricing["input_tokens"], pricing["output_tokens"])
+    for model, pricing in LLM_PRICING.items()
+}
+_DEFAULT_PRICES = _PRICES["claude-sonnet-4"]
+
 # ============================================================================
 # Helper Functions
 # ============================================================================
@@ -108,6 +118,27 @@ def get_member_profiles_table_path():
     """Get member profiles table full path"""
     return get_table_path(MEMBER_PROFILES_TABLE)
 
+# Endpoint-name keyword -> pricing model type, checked in order
+MODEL_TYPE_KEYWORDS = (
+    ("opus", "claude-opus-4-1"),
+    ("sonnet", "claude-sonnet-4"),
+    ("haiku", "claude-haiku-4"),
+)
+
+def detect_model_type(endpoint, default="claude-sonnet-4"):
+    """
+    Map an endpoint name to its pricing model type.
+
+    Args:
+        endpoint: Serving endpoint name like "databricks-claude-opus-4-1"
+        default: Model type used when no keyword matches
+
+    Returns:
+        Model type key into LLM_PRICING
+    """
+    endpoint_lc = endpoint.lower()
+    return next((model for key, model in MODEL_TYPE_KEYWORDS if key in endpoint_lc), default)
+
 def calculate_llm_cost(input_tokens, output_tokens, model_type):
     """
     Calculate cost based on official Databricks GenAI pricing.
@@ -124,17 +155,10 @@ def calculate_llm_cost(input_tokens, output_tokens, model_type):
     if model_type.startswith("databricks-"):
         model_type = model_type.replace("databricks-", "")
 
-    # Check if model type exists in pricing
-    if model_type not in LLM_PRICING:
-        model_type = "claude-sonnet-4"  # fallback
-
-    pricing = LLM_PRICING[model_type]
-
-    input_cost = (input_tokens / 1_000_000) * pricing["input_tokens"]
-    output_cost = (output_tokens / 1_000_000) * pricing["output_tokens"]
+    # Single dict probe; unknown models fall back to claude-sonnet-4 pricing
+    input_price, output_price = _PRICES.get(model_type, _DEFAULT_PRICES)
 
-    total_cost = input_cost + output_cost
-    return total_cost
+    return (input_tokens / 1_000_000) * input_price + (output_tokens / 1_000_000) * output_price
 
 def validate_configuration():
     """Validate that required configuration is set"""
@@ -180,11 +204,14 @@ __all__ = [
     'MEMBER_PROFILES_TABLE',
     'MLFLOW_PROD_EXPERIMENT_PATH',
     'MLFLOW_OFFLINE_EVAL_PATH',
+    'MLFLOW_ENABLED',
     'BRANDCONFIG',
     'LLM_PRICING',
     'get_table_path',
     'get_governance_table_path',
     'get_member_profiles_table_path',
+    'MODEL_TYPE_KEYWORDS',
+    'detect_model_type',
     'calculate_llm_cost',
     'validate_configuration',
 ]
@@ -5,7 +5,7 @@ Centralized country configurations for easy multi-country support
 """
 
 from dataclasses import dataclass
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 
 
 @dataclass
@@ -239,6 +239,29 @@ ALWAYS use the balance amounts shown in the tool calculation notes.""",
 }
 
 
+# Map tool types to authority indices
+TOOL_TO_AUTHORITY_INDEX = {
+    "tax": 0,
+    "benefit": 1,
+    "projection": 2,
+    "eps_benefit": 1  # For India, EPS benefit uses same authority as benefit
+}
+
+
+def _build_authority_map() -> Dict[Tuple[str, str], str]:
+    """Flatten COUNTRY_CONFIGS authorities into a (country, tool_type) lookup."""
+    return {
+        (code, tool_type): config.authorities[index]
+        for code, config in COUNTRY_CONFIGS.items()
+        for tool_type, index in TOOL_TO_AUTHORITY_INDEX.items()
+        if index < len(config.authorities)
+    }
+
+
+# Precomputed at import so the per-tool hot path is a single dict lookup
+AUTHORITY_MAP = _build_authority_map()
+
+
 def get_authority(country_code: str, tool_type: str) -> str:
     """
     Get regulatory authority for a country and tool type.
@@ -250,17 +273,14 @@ def get_authority(country_code: str, tool_type: str) -> str:
     Returns:
         Authority name string
     """
-    config = get_country_config(country_code)
+    authority = AUTHORITY_MAP.get((country_code, tool_type))
+    if authority is not None:
+        return authority
     
-    # Map tool types to authority indices
-    tool_to_authority_map = {
-        "tax": 0,
-        "benefit": 1,
-        "projection": 2,
-        "eps_benefit": 1  # For India, EPS benefit uses same authority as benefit
-    }
+    # Slow path: lowercase codes, unknown tool types, unknown countries (raises)
+    config = get_country_config(country_code)
     
-    authority_index = tool_to_authority_map.get(tool_type, 0)
+    authority_index = TOOL_TO_AUTHORITY_INDEX.get(tool_type, 0)
     
     if authority_index < len(config.authorities):
         return config.authorities[authority_index]
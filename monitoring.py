@@ -12,7 +12,8 @@ import mlflow
 import time
 from datetime import datetime
 from typing import Dict, Optional, List
-from databricks.sdk import WorkspaceClient
+from observability import ensure_mlflow_experiment
+from utils.lakehouse import get_workspace_client
 from config import (
     MLFLOW_PROD_EXPERIMENT_PATH,
     UNITY_CATALOG,
@@ -41,12 +42,12 @@ class AgentMonitor:
             experiment_path: MLflow experiment path
         """
         self.experiment_path = experiment_path or MLFLOW_PROD_EXPERIMENT_PATH
-        self.w = WorkspaceClient()
+        self.w = get_workspace_client()
         
-        # Set up MLflow
+        # Set up MLflow (experiment resolved once per process, passed to start_run)
+        self.experiment_id = None
         try:
-            mlflow.set_tracking_uri("databricks")
-            mlflow.set_experiment(self.experiment_path)
+            self.experiment_id = ensure_mlflow_experiment(self.experiment_path)
             logger.info(f"✅ MLflow monitoring initialized: {self.experiment_path}")
         except Exception as e:
             logger.info(f"⚠️ MLflow initialization warning: {e}")
@@ -74,7 +75,7 @@ class AgentMonitor:
         try:
             run_name = f"query-{session_id}-{datetime.now().strftime('%Y%m%d-%H%M%S')}"
             
-            with mlflow.start_run(run_name=run_name) as run:
+            with mlflow.start_run(experiment_id=self.experiment_id, run_name=run_name) as run:
                 # === PARAMETERS (Query Context) ===
                 mlflow.log_param("session_id", session_id)
                 mlflow.log_param("user_id", user_id)
@@ -175,7 +176,7 @@ class AgentMonitor:
         try:
             run_name = f"classifier-metrics-{datetime.now().strftime('%Y%m%d-%H%M%S')}"
             
-            with mlflow.start_run(run_name=run_name):
+            with mlflow.start_run(experiment_id=self.experiment_id, run_name=run_name):
                 # Stage distribution
                 mlflow.log_metric("stage1_percentage", classifier_metrics.get('stage1_percentage', 0))
                 mlflow.log_metric("stage2_percentage", classifier_metrics.get('stage2_percentage', 0))
@@ -216,7 +217,7 @@ class AgentMonitor:
         try:
             run_name = f"{model_type}-performance-{period}-{datetime.now().strftime('%Y%m%d-%H')}"
             
-            with mlflow.start_run(run_name=run_name):
+            with mlflow.start_run(experiment_id=self.experiment_id, run_name=run_name):
                 mlflow.log_param("model_type", model_type)
                 mlflow.log_param("period", period)
                 mlflow.log_param("timestamp", datetime.now().isoformat())
@@ -250,7 +251,7 @@ class LakehouseMonitor:
     
     def __init__(self):
         """Initialize Lakehouse Monitor."""
-        self.w = WorkspaceClient()
+        self.w = get_workspace_client()
         self.governance_table = f"{UNITY_CATALOG}.{UNITY_SCHEMA}.governance"
         logger.info(f"✅ Lakehouse Monitor initialized for {self.governance_table}")
     
@@ -9,12 +9,14 @@ Using Databricks native tools: MLflow + Lakehouse Monitoring
 """
 
 import mlflow
+from mlflow.entities import Metric, Param, RunTag
 import time
 import json
 from datetime import datetime
+from functools import lru_cache
 from typing import Dict, List, Optional, Any
-from databricks.sdk import WorkspaceClient
 from databricks.sdk.service.catalog import MonitorInfoStatus
+from utils.lakehouse import get_workspace_client
 from config import (
     UNITY_CATALOG, 
     UNITY_SCHEMA, 
@@ -23,6 +25,45 @@ from config import (
 )
 
 
+@lru_cache(maxsize=8)
+def ensure_mlflow_experiment(experiment_path: str) -> str:
+    """
+    Point MLflow at Databricks and select ``experiment_path``, once per process.
+    
+    set_experiment is a REST lookup (or create); agents and audit loggers are
+    built per query, so the resolved id is cached and passed to start_run.
+    Failures are not cached and are retried on the next call.
+    
+    Args:
+        experiment_path: Workspace path of the MLflow experiment
+        
+    Returns:
+        Experiment id
+    """
+    mlflow.set_tracking_uri("databricks")
+    return mlflow.set_experiment(experiment_path).experiment_id
+
+
+def _sum_usage(results: List[Dict]) -> tuple:
+    """
+    Total (input_tokens, output_tokens, cost, duration) over attempt results in one pass.
+    
+    Args:
+        results: Synthesis or validation attempt dicts
+        
+    Returns:
+        Tuple of summed input tokens, output tokens, cost and duration
+    """
+    input_tokens = output_tokens = 0
+    cost = duration = 0.0
+    for item in results:
+        input_tokens += item.get('input_tokens', 0)
+        output_tokens += item.get('output_tokens', 0)
+        cost += item.get('cost', 0.0)
+        duration += item.get('duration', 0.0)
+    return input_tokens, output_tokens, cost, duration
+
+
 class AgentObservability:
     """
     Comprehensive observability for SuperAdvisor Agent using:
@@ -42,7 +83,8 @@ class AgentObservability:
             enable_mlflow: Enable MLflow tracking
             enable_lakehouse_monitoring: Enable Lakehouse Monitoring
         """
-        self.w = WorkspaceClient()
+        # Shared pooled client; agent_query builds one observability object per query
+        self.w = get_workspace_client()
         self.experiment_path = experiment_path or MLFLOW_PROD_EXPERIMENT_PATH
         self.enable_mlflow = enable_mlflow
         self.enable_lakehouse_monitoring = enable_lakehouse_monitoring
@@ -51,6 +93,8 @@ class AgentObservability:
         self.governance_table = f"{UNITY_CATALOG}.{UNITY_SCHEMA}.governance"
         
         # Current MLflow run context
+        self.experiment_id = None
+        self.mlflow_client = None
         self.current_run = None
         self.run_metrics = {}
         
@@ -64,8 +108,8 @@ class AgentObservability:
     def _setup_mlflow(self):
         """Setup MLflow experiment and tracking."""
         try:
-            mlflow.set_tracking_uri("databricks")
-            mlflow.set_experiment(self.experiment_path)
+            self.experiment_id = ensure_mlflow_experiment(self.experiment_path)
+            self.mlflow_client = mlflow.tracking.MlflowClient()
             logger.info(f"✅ MLflow experiment: {self.experiment_path}")
         except Exception as e:
             logger.info(f"⚠️ MLflow setup warning: {e}")
@@ -73,6 +117,29 @@ class AgentObservability:
     
     # ========== MLFLOW TRACKING ==========
     
+    def _log_to_run(self,
+                    metrics: Optional[Dict] = None,
+                    params: Optional[Dict] = None,
+                    tags: Optional[Dict] = None):
+        """
+        Send metrics, params and tags to the current run in one log_batch request.
+        
+        Addresses the run by id rather than through the fluent active-run
+        stack, so the per-stage log_* methods can run on a background thread.
+        
+        Args:
+            metrics: Metric name -> numeric value
+            params: Param name -> value (stringified)
+            tags: Tag name -> value (stringified)
+        """
+        timestamp_ms = int(time.time() * 1000)
+        self.mlflow_client.log_batch(
+            run_id=self.current_run.info.run_id,
+            metrics=[Metric(key, float(value), timestamp_ms, 0) for key, value in (metrics or {}).items()],
+            params=[Param(key, str(value)) for key, value in (params or {}).items()],
+            tags=[RunTag(key, str(value)) for key, value in (tags or {}).items()]
+        )
+    
     def start_agent_run(self, 
                        session_id: str,
                        user_id: str,
@@ -96,33 +163,26 @@ class AgentObservability:
             return None
         
         try:
-            # ✅ SAFETY: Close any active run first (prevents "run already active" error)
-            try:
-                active_run = mlflow.active_run()
-                if active_run:
-                    logger.info(f"⚠️ Closing stale MLflow run: {active_run.info.run_id}")
-                    mlflow.end_run()
-            except Exception as cleanup_error:
-                logger.info(f"⚠️ Error cleaning up stale run: {cleanup_error}")
-            
             run_name = f"agent-query-{session_id[:8]}"
             
-            # Start MLflow run
-            self.current_run = mlflow.start_run(run_name=run_name)
+            run_tags = {"component": "superadvisor_agent", "country": country}
+            if tags:
+                run_tags.update((key, str(value)) for key, value in tags.items())
             
-            # Log parameters
-            mlflow.log_param("session_id", session_id)
-            mlflow.log_param("user_id", user_id)
-            mlflow.log_param("country", country)
-            mlflow.log_param("query_length", len(query))
-            mlflow.log_param("timestamp", datetime.utcnow().isoformat())
+            # Created through the client, not fluent start_run: the run is ended
+            # on the audit thread, and the fluent active-run stack is per thread
+            self.current_run = self.mlflow_client.create_run(
+                self.experiment_id, run_name=run_name, tags=run_tags
+            )
             
-            # Log tags
-            mlflow.set_tag("component", "superadvisor_agent")
-            mlflow.set_tag("country", country)
-            if tags:
-                for key, value in tags.items():
-                    mlflow.set_tag(key, str(value))
+            # Log parameters (one batched request)
+            self._log_to_run(params={
+                "session_id": session_id,
+                "user_id": user_id,
+                "country": country,
+                "query_length": len(query),
+                "timestamp": datetime.utcnow().isoformat(),
+            })
             
             # Initialize metrics tracking
             self.run_metrics = {
@@ -153,22 +213,26 @@ class AgentObservability:
         try:
             self.run_metrics['classification'] = result
             
-            mlflow.log_metric("classification.is_on_topic", 1.0 if result.get('is_on_topic') else 0.0)
-            mlflow.log_metric("classification.confidence", result.get('confidence', 0.0))
-            mlflow.log_metric("classification.latency_ms", result.get('latency_ms', 0.0))
-            mlflow.log_metric("classification.cost_usd", result.get('cost_usd', 0.0))
-            
-            mlflow.log_param("classification.method", result.get('method', 'unknown'))
-            mlflow.log_param("classification.result", result.get('classification', 'unknown'))
+            method = result.get('method', 'unknown')
+            metrics = {
+                "classification.is_on_topic": 1.0 if result.get('is_on_topic') else 0.0,
+                "classification.confidence": result.get('confidence', 0.0),
+                "classification.latency_ms": result.get('latency_ms', 0.0),
+                "classification.cost_usd": result.get('cost_usd', 0.0),
+            }
             
             # Log stage used (for monitoring stage distribution)
-            method = result.get('method', 'unknown')
             if 'regex' in method:
-                mlflow.log_metric("classification.stage", 1)
+                metrics["classification.stage"] = 1
             elif 'embedding' in method:
-                mlflow.log_metric("classification.stage", 2)
+                metrics["classification.stage"] = 2
             elif 'llm' in method:
-                mlflow.log_metric("classification.stage", 3)
+                metrics["classification.stage"] = 3
+            
+            self._log_to_run(metrics, {
+                "classification.method": method,
+                "classification.result": result.get('classification', 'unknown'),
+            })
             
         except Exception as e:
             logger.info(f"⚠️ Error logging classification: {e}")
@@ -190,21 +254,22 @@ class AgentObservability:
                 'tools_count': len(tools_used)
             }
             
-            mlflow.log_metric("tools.count", len(tools_used))
-            mlflow.log_param("tools.used", ",".join(tools_used) if tools_used else "none")
-            
             # Log tool success/failure
             failed_tools = [
                 name for name, result in tool_results.items()
                 if isinstance(result, dict) and 'error' in result
             ]
             
-            mlflow.log_metric("tools.failed_count", len(failed_tools))
-            mlflow.log_metric("tools.success_rate", 
-                            (len(tools_used) - len(failed_tools)) / len(tools_used) if tools_used else 1.0)
-            
+            params = {"tools.used": ",".join(tools_used) if tools_used else "none"}
             if failed_tools:
-                mlflow.log_param("tools.failures", ",".join(failed_tools))
+                params["tools.failures"] = ",".join(failed_tools)
+            
+            self._log_to_run({
+                "tools.count": len(tools_used),
+                "tools.failed_count": len(failed_tools),
+                "tools.success_rate":
+                    (len(tools_used) - len(failed_tools)) / len(tools_used) if tools_used else 1.0,
+            }, params)
             
         except Exception as e:
             logger.info(f"⚠️ Error logging tool execution: {e}")
@@ -220,10 +285,7 @@ class AgentObservability:
             return
         
         try:
-            total_input_tokens = sum(s.get('input_tokens', 0) for s in synthesis_results)
-            total_output_tokens = sum(s.get('output_tokens', 0) for s in synthesis_results)
-            total_cost = sum(s.get('cost', 0.0) for s in synthesis_results)
-            total_duration = sum(s.get('duration', 0.0) for s in synthesis_results)
+            total_input_tokens, total_output_tokens, total_cost, total_duration = _sum_usage(synthesis_results)
             
             self.run_metrics['synthesis'] = {
                 'attempts': len(synthesis_results),
@@ -234,15 +296,18 @@ class AgentObservability:
                 'duration': total_duration
             }
             
-            mlflow.log_metric("synthesis.attempts", len(synthesis_results))
-            mlflow.log_metric("synthesis.input_tokens", total_input_tokens)
-            mlflow.log_metric("synthesis.output_tokens", total_output_tokens)
-            mlflow.log_metric("synthesis.total_tokens", total_input_tokens + total_output_tokens)
-            mlflow.log_metric("synthesis.cost_usd", total_cost)
-            mlflow.log_metric("synthesis.duration_sec", total_duration)
-            
+            params = {}
             if synthesis_results:
-                mlflow.log_param("synthesis.model", synthesis_results[0].get('model', 'unknown'))
+                params["synthesis.model"] = synthesis_results[0].get('model', 'unknown')
+            
+            self._log_to_run({
+                "synthesis.attempts": len(synthesis_results),
+                "synthesis.input_tokens": total_input_tokens,
+                "synthesis.output_tokens": total_output_tokens,
+                "synthesis.total_tokens": total_input_tokens + total_output_tokens,
+                "synthesis.cost_usd": total_cost,
+                "synthesis.duration_sec": total_duration,
+            }, params)
             
         except Exception as e:
             logger.info(f"⚠️ Error logging synthesis: {e}")
@@ -263,10 +328,7 @@ class AgentObservability:
             
             final_validation = validation_results[-1]
             
-            total_input_tokens = sum(v.get('input_tokens', 0) for v in validation_results)
-            total_output_tokens = sum(v.get('output_tokens', 0) for v in validation_results)
-            total_cost = sum(v.get('cost', 0.0) for v in validation_results)
-            total_duration = sum(v.get('duration', 0.0) for v in validation_results)
+            total_input_tokens, total_output_tokens, total_cost, total_duration = _sum_usage(validation_results)
             
             self.run_metrics['validation'] = {
                 'attempts': len(validation_results),
@@ -279,24 +341,23 @@ class AgentObservability:
                 'duration': total_duration
             }
             
-            mlflow.log_metric("validation.attempts", len(validation_results))
-            mlflow.log_metric("validation.passed", 1.0 if final_validation.get('passed') else 0.0)
-            mlflow.log_metric("validation.confidence", final_validation.get('confidence', 0.0))
-            mlflow.log_metric("validation.input_tokens", total_input_tokens)
-            mlflow.log_metric("validation.output_tokens", total_output_tokens)
-            mlflow.log_metric("validation.total_tokens", total_input_tokens + total_output_tokens)
-            mlflow.log_metric("validation.cost_usd", total_cost)
-            mlflow.log_metric("validation.duration_sec", total_duration)
-            
-            # Log violations
             violations = final_validation.get('violations', [])
-            mlflow.log_metric("validation.violations_count", len(violations))
-            
-            if validation_results:
-                mlflow.log_param("validation.model", validation_results[0].get('model', 'unknown'))
+            self._log_to_run({
+                "validation.attempts": len(validation_results),
+                "validation.passed": 1.0 if final_validation.get('passed') else 0.0,
+                "validation.confidence": final_validation.get('confidence', 0.0),
+                "validation.input_tokens": total_input_tokens,
+                "validation.output_tokens": total_output_tokens,
+                "validation.total_tokens": total_input_tokens + total_output_tokens,
+                "validation.cost_usd": total_cost,
+                "validation.duration_sec": total_duration,
+                "validation.violations_count": len(violations),
+            }, {"validation.model": validation_results[0].get('model', 'unknown')})
             
             # Log validation details as artifact
-            mlflow.log_dict(final_validation, "validation_result.json")
+            self.mlflow_client.log_dict(
+                self.current_run.info.run_id, final_validation, "validation_result.json"
+            )
             
         except Exception as e:
             logger.info(f"⚠️ Error logging validation: {e}")
@@ -316,12 +377,15 @@ class AgentObservability:
         if not self.enable_mlflow:
             return
         
-        # ✅ SAFETY: Check if there's actually an active run
-        if not mlflow.active_run():
-            logger.info("⚠️ No active MLflow run to end")
-            self.current_run = None
+        # ✅ SAFETY: Check if this object actually started a run
+        if not self.current_run:
+            logger.info("⚠️ No MLflow run to end")
             return
         
+        # Addressed by id throughout: this runs on the audit thread, not the
+        # thread that called start_agent_run
+        run_id = self.current_run.info.run_id
+        
         try:
             # Calculate total metrics
             elapsed = time.time() - self.run_metrics.get('start_time', time.time())
@@ -339,27 +403,30 @@ class AgentObservability:
                 self.run_metrics.get('validation', {}).get('total_tokens', 0)
             )
             
-            # Log totals
-            mlflow.log_metric("total.duration_sec", elapsed)
-            mlflow.log_metric("total.cost_usd", total_cost)
-            mlflow.log_metric("total.tokens", total_tokens)
-            mlflow.log_metric("total.success", 1.0 if success else 0.0)
-            mlflow.log_metric("response.length", len(response))
-            
-            # Log status
-            mlflow.set_tag("status", "success" if success else "failed")
+            # Log totals and status (one batched request)
+            status_tags = {"status": "success" if success else "failed"}
             if error:
-                mlflow.set_tag("error", error)
+                status_tags["error"] = error
+            self._log_to_run(
+                metrics={
+                    "total.duration_sec": elapsed,
+                    "total.cost_usd": total_cost,
+                    "total.tokens": total_tokens,
+                    "total.success": 1.0 if success else 0.0,
+                    "response.length": len(response),
+                },
+                tags=status_tags
+            )
             
             # Log response as artifact (truncated)
             response_truncated = response[:5000] if len(response) > 5000 else response
-            mlflow.log_text(response_truncated, "response.txt")
+            self.mlflow_client.log_text(run_id, response_truncated, "response.txt")
             
             # Log full metrics as JSON
-            mlflow.log_dict(self.run_metrics, "metrics_summary.json")
+            self.mlflow_client.log_dict(run_id, self.run_metrics, "metrics_summary.json")
             
             # End run
-            mlflow.end_run()
+            self.mlflow_client.set_terminated(run_id, status="FINISHED")
             self.current_run = None
             
             logger.info(f"✅ MLflow run completed: ${total_cost:.6f}, {elapsed:.2f}s, {total_tokens} tokens")
@@ -367,8 +434,9 @@ class AgentObservability:
         except Exception as e:
             logger.info(f"⚠️ Error ending MLflow run: {e}")
             try:
-                mlflow.end_run(status="FAILED")
-            except:
+                self.mlflow_client.set_terminated(run_id, status="FAILED")
+                self.current_run = None
+            except Exception:
                 pass
     
     # ========== LAKEHOUSE MONITORING ==========
@@ -506,9 +574,7 @@ class AgentObservability:
             return monitor
             
         except Exception as e:
-            logger.info(f"❌ Error setting up Lakehouse Monitoring: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("❌ Error setting up Lakehouse Monitoring: %s", e)
             return None
     
     def get_monitoring_dashboard_url(self) -> Optional[str]:
@@ -8,11 +8,10 @@ Prompts Registry with MLflow Integration
 Centralized prompt management with versioning and tracking
 """
 
-import mlflow
 from typing import Dict, Optional
 from datetime import datetime
 from country_config import get_country_config, get_special_instructions
-from config import MLFLOW_PROD_EXPERIMENT_PATH
+from config import MLFLOW_PROD_EXPERIMENT_PATH, MLFLOW_ENABLED
 
 
 class PromptsRegistry:
@@ -29,7 +28,8 @@ class PromptsRegistry:
             experiment_name: MLflow experiment name for prompt tracking
             enable_mlflow: Enable/disable MLflow integration
         """
-        self.enable_mlflow = enable_mlflow
+        # MLFLOW_DISABLED=1 overrides callers that ask for MLflow
+        self.enable_mlflow = enable_mlflow and MLFLOW_ENABLED
         # ✅ Use MLFLOW_PROD_EXPERIMENT_PATH from config.py instead of hardcoded default
         self.experiment_name = experiment_name or MLFLOW_PROD_EXPERIMENT_PATH
         self.prompt_version = "1.0.0"
@@ -37,6 +37,8 @@ class PromptsRegistry:
         
         if self.enable_mlflow:
             try:
+                # Imported here so the agent pipeline never loads mlflow when disabled
+                import mlflow
                 mlflow.set_experiment(self.experiment_name)
                 logger.info(f"✅ MLflow prompts registry initialized: {self.experiment_name}")
             except Exception as e:
@@ -517,6 +519,8 @@ ORDER BY citation_id"""
             logger.info("⚠️ MLflow disabled, skipping prompt registration")
             return
         
+        import mlflow
+        
         try:
             run_name = run_name or f"prompts_v{self.prompt_version}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
             
@@ -566,9 +570,7 @@ ORDER BY citation_id"""
                 return run.info.run_id
                 
         except Exception as e:
-            logger.info(f"❌ Error registering prompts with MLflow: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("❌ Error registering prompts with MLflow: %s", e)
             return None
     
     def get_prompt_metadata(self) -> Dict:
@@ -5,16 +5,22 @@ Implements the Reasoning + Acting pattern for multi-step query processing
 """
 
 import time
-import traceback
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import Dict, List, Optional, Any
 from dataclasses import dataclass, field
-from databricks.sdk import WorkspaceClient
 from databricks.sdk.service.sql import StatementState
 
 from config import SQL_WAREHOUSE_ID, MAX_VALIDATION_ATTEMPTS, CLASSIFIER_LLM_ENDPOINT
 from prompts_registry import get_prompts_registry
 from country_config import get_country_config
 from classifier import EmbeddingCascadeClassifier
+from utils.lakehouse import get_workspace_client
+from shared.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Background pool for I/O that is independent of synthesis (citation SQL)
+_citation_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="citations")
 
 
 @dataclass
@@ -25,11 +31,13 @@ class AgentState:
     country: str
     member_profile: Dict
     withdrawal_amount: Optional[float] = None
+    query_lower: str = ""
     
     # Context and names
     context: str = ""
     real_name: str = "Unknown Member"
     anonymized_name: Optional[str] = None
+    needs_restore: bool = False
     
     # Classification results
     classification: Dict = field(default_factory=dict)
@@ -38,6 +46,7 @@ class AgentState:
     # Tool execution
     selected_tools: List[str] = field(default_factory=list)
     tool_results: Dict = field(default_factory=dict)
+    tool_context: Optional[str] = None  # tool_results formatted once for synthesis
     
     # Response generation
     synthesis_attempts: List[Dict] = field(default_factory=list)
@@ -46,10 +55,17 @@ class AgentState:
     # Final response
     final_response: str = ""
     citations: List[Dict] = field(default_factory=list)
+    citations_future: Optional[Future] = None
+    citations_section: Optional[str] = None
     
     # Metrics
     attempts: int = 0
     validation_passed: bool = False
+    
+    def __post_init__(self):
+        # Case-fold once; shared by classification and tool selection
+        if not self.query_lower:
+            self.query_lower = self.user_query.casefold()
 
 
 class ReactAgenticLoop:
@@ -70,7 +86,7 @@ class ReactAgenticLoop:
             agent_instance: Reference to SuperAdvisorAgent instance
         """
         self.agent = agent_instance
-        self.w = WorkspaceClient()
+        self.w = get_workspace_client()
         self.prompts_registry = get_prompts_registry()
         
         # Initialize new embedding-based cascade classifier
@@ -80,10 +96,8 @@ class ReactAgenticLoop:
             enable_cache=True,
             llm_endpoint=CLASSIFIER_LLM_ENDPOINT  # databricks-gpt-oss-120b
         )
-        
-        self.printf = printf
     
-    def classify_query_topic(self, user_query: str) -> Dict:
+    def classify_query_topic(self, user_query: str, query_lower: Optional[str] = None) -> Dict:
         """
         Intelligent 3-stage cascade classification:
         Stage 1: Regex patterns (80% of queries, <1ms, $0)
@@ -92,6 +106,7 @@ class ReactAgenticLoop:
         
         Args:
             user_query: User's query to classify
+            query_lower: Pre-computed case-folded query (optional)
             
         Returns:
             Classification result dictionary with:
@@ -103,7 +118,7 @@ class ReactAgenticLoop:
             - cost_usd: float
         """
         try:
-            result = self.classifier.classify(user_query)
+            result = self.classifier.classify(user_query, query_lower)
             
             # Log classification details
             method = result.get('method', 'unknown')
@@ -113,15 +128,15 @@ class ReactAgenticLoop:
             cached = result.get('cached', False)
             
             if cached:
-                self.printf(f"💾 Classification cached: {result['classification']} (confidence: {confidence:.2f})")
+                logger.debug("💾 Classification cached: %s (confidence: %.2f)", result['classification'], confidence)
             else:
-                self.printf(f"🏷️  Query classified via {method}: '{result['classification']}'")
-                self.printf(f"   Confidence: {confidence:.2f} | Latency: {latency:.1f}ms | Cost: ${cost:.6f}")
+                logger.info("🏷️  Query classified via %s: '%s'", method, result['classification'])
+                logger.debug("   Confidence: %.2f | Latency: %.1fms | Cost: $%.6f", confidence, latency, cost)
             
             return result
             
         except Exception as e:
-            self.printf(f"❌ Error in classification: {e}")
+            logger.error("❌ Error in classification: %s", e)
             # Default to on-topic to avoid false rejections
             return {
                 "is_on_topic": True,
@@ -141,9 +156,9 @@ class ReactAgenticLoop:
         Returns:
             Response dictionary
         """
-        self.printf(f"❌ OFF-TOPIC QUERY DETECTED: {state.classification['classification']}")
-        self.printf("✅ Ending conversation politely without tool/LLM calls")
-        self.printf("💰 Cost saved: $0.08+ (no tools, no synthesis, no validation)")
+        logger.info("❌ OFF-TOPIC QUERY DETECTED: %s", state.classification['classification'])
+        logger.debug("✅ Ending conversation politely without tool/LLM calls")
+        logger.debug("💰 Cost saved: $0.08+ (no tools, no synthesis, no validation)")
         
         decline_message = self.prompts_registry.get_off_topic_decline_message(
             real_name=state.real_name,
@@ -178,7 +193,7 @@ class ReactAgenticLoop:
         Returns:
             List of selected tool names
         """
-        query_lower = state.user_query.lower()
+        query_lower = state.query_lower
         config = get_country_config(state.country)
         tools = []
         
@@ -204,7 +219,8 @@ class ReactAgenticLoop:
         if not tools:
             tools = config.available_tools[:2] if len(config.available_tools) >= 2 else config.available_tools
         
-        return list(set(tools))
+        # dict.fromkeys dedupes while keeping selection order stable
+        return list(dict.fromkeys(tools))
     
     def act_execute_tools(self, state: AgentState, tools: List[str]) -> Dict:
         """
@@ -228,9 +244,9 @@ class ReactAgenticLoop:
                     state.country
                 )
                 tool_results[tool_name] = result
-                self.printf(f"✅ Tool '{tool_name}' executed successfully")
+                logger.debug("✅ Tool '%s' executed successfully", tool_name)
             except Exception as e:
-                self.printf(f"❌ Tool '{tool_name}' failed: {e}")
+                logger.warning("❌ Tool '%s' failed: %s", tool_name, e)
                 tool_results[tool_name] = {"error": str(e)}
         
         return tool_results
@@ -246,13 +262,15 @@ class ReactAgenticLoop:
         Returns:
             Response data dictionary with text, tokens, and cost
         """
-        self.printf(f"\n🔄 Synthesis Attempt {attempt}/{MAX_VALIDATION_ATTEMPTS}")
+        logger.debug("🔄 Synthesis Attempt %d/%d", attempt, MAX_VALIDATION_ATTEMPTS)
         
         response_data = self.agent.generate_response(
             state.user_query,
             state.context,
             state.tool_results,
-            state.validation_history
+            country=state.country,
+            validation_history=state.validation_history,
+            tool_context=state.tool_context
         )
         
         state.synthesis_attempts.append({
@@ -295,6 +313,9 @@ class ReactAgenticLoop:
         """
         Finalize response with name restoration, greeting, and citations.
         
+        Expects ``state.citations`` to be resolved already so the citation
+        lookup is not repeated.
+        
         Args:
             response_text: Raw response text
             state: Current agent state
@@ -302,29 +323,79 @@ class ReactAgenticLoop:
         Returns:
             Finalized response text
         """
-        # Restore real name if anonymized
-        if state.anonymized_name and state.real_name:
-            response_text = self.agent.restore_member_name(
-                response_text, 
-                state.anonymized_name, 
-                state.real_name
-            )
-            self.printf(f"🔓 Restored anonymised '{state.anonymized_name}' → '{state.real_name}'")
-        
-        # Add personalized greeting
-        response_text = self.agent.add_personalized_greeting(response_text, state.real_name)
-        self.printf(f"✅ Added personalized greeting for {state.real_name}")
-        
-        # Add citations and disclaimer
-        response_text = self.agent.add_citations_and_disclaimer(
-            response_text, 
-            state.country, 
-            state.selected_tools
+        # Restore, greet and append citations in a single fused pass
+        response_text = self.agent.finalize_response(
+            response_text,
+            state.anonymized_name,
+            state.real_name,
+            state.country,
+            state.selected_tools,
+            citations=state.citations,
+            needs_restore=state.needs_restore,
+            citations_section=state.citations_section
         )
-        self.printf(f"📚 Added citations for {state.country}")
+        logger.debug("✅ Finalized response for %s (%s)", state.real_name, state.country)
         
         return response_text
     
+    def _fetch_citations(self, country: str, tools: List[str]) -> tuple:
+        """Fetch citations and pre-render the response footer (runs in the pool)."""
+        return self.agent.get_citations_and_section(country, tools)
+    
+    def warm_citation_index(self) -> None:
+        """
+        Load the shared citation index in the background.
+        
+        Called as soon as the member's country is known so a cold index load
+        overlaps with classification instead of delaying the citation prefetch.
+        """
+        _citation_executor.submit(self.agent._get_citation_index)
+    
+    def prefetch_citations(self, state: AgentState) -> None:
+        """
+        Start the citation lookup in the background so the SQL round-trip
+        and footer formatting overlap with tool execution and LLM synthesis.
+        
+        Args:
+            state: Current agent state (country and selected_tools must be set)
+        """
+        if not state.selected_tools:
+            return  # Nothing to cite; the footer is the static disclaimer
+        state.citations_future = _citation_executor.submit(
+            self._fetch_citations,
+            state.country,
+            state.selected_tools
+        )
+    
+    def await_citations(self, state: AgentState) -> List[Dict]:
+        """
+        Resolve prefetched citations, falling back to a direct lookup.
+        
+        Also stores the pre-rendered footer on ``state.citations_section``.
+        
+        Args:
+            state: Current agent state
+            
+        Returns:
+            List of citation dictionaries
+        """
+        future = state.citations_future
+        if future is not None:
+            try:
+                if future.done():
+                    logger.debug("📚 Citations ready before validation finished (latency hidden)")
+                    citations, state.citations_section = future.result()
+                else:
+                    wait_start = time.perf_counter()
+                    citations, state.citations_section = future.result()
+                    logger.debug("📚 Waited %.1fms for citation prefetch",
+                                 (time.perf_counter() - wait_start) * 1000)
+                return citations
+            except Exception as e:
+                logger.warning("⚠️ Citation prefetch failed: %s", e)
+        state.citations_section = None
+        return self.agent.get_citations_for_tools(state.country, state.selected_tools)
+    
     def get_classifier_metrics(self) -> Dict:
         """
         Get classifier performance metrics.
@@ -349,7 +420,7 @@ class ReactAgenticLoop:
             Complete response dictionary
         """
         # Phase 1: REASON - Classify query
-        self.printf("🔍 Phase 1: REASON - Classifying query topic...")
+        logger.debug("🔍 Phase 1: REASON - Classifying query topic...")
         try:
             from utils.progress import mark_phase_running, mark_phase_complete, mark_phase_error
             mark_phase_running('phase_3_classification')
@@ -357,7 +428,7 @@ class ReactAgenticLoop:
             pass
         
         try:
-            state.classification = self.classify_query_topic(state.user_query)
+            state.classification = self.classify_query_topic(state.user_query, state.query_lower)
             
             # Check if classification failed
             if state.classification.get('method') == 'llm_fallback_error' or state.classification.get('error'):
@@ -371,7 +442,7 @@ class ReactAgenticLoop:
                 except:
                     pass
         except Exception as e:
-            self.printf(f"❌ Classification error: {e}")
+            logger.error("❌ Classification error: %s", e)
             try:
                 mark_phase_error('phase_3_classification', str(e))
             except:
@@ -387,17 +458,20 @@ class ReactAgenticLoop:
         if not state.classification["is_on_topic"]:
             return self.handle_off_topic_query(state)
         
-        self.printf(f"✅ Query is ON-TOPIC: '{state.classification['classification']}'")
+        logger.debug("✅ Query is ON-TOPIC: '%s'", state.classification['classification'])
         
         # Phase 2: REASON - Select tools
-        self.printf("\n🧠 Phase 2: REASON - Selecting tools...")
+        logger.debug("🧠 Phase 2: REASON - Selecting tools...")
         try:
             mark_phase_running('phase_4_planning')
         except:
             pass
         
         state.selected_tools = self.reason_and_select_tools(state)
-        self.printf(f"✅ Tools selected: {state.selected_tools}")
+        logger.info("✅ Tools selected: %s", state.selected_tools)
+        
+        # Citations depend only on country + tools: fetch them while we synthesize
+        self.prefetch_citations(state)
         
         try:
             mark_phase_complete('phase_4_planning')
@@ -405,7 +479,7 @@ class ReactAgenticLoop:
             pass
         
         # Phase 3: ACT - Execute tools
-        self.printf("\n⚙️  Phase 3: ACT - Executing tools...")
+        logger.debug("⚙️  Phase 3: ACT - Executing tools...")
         try:
             mark_phase_running('phase_5_execution')
         except:
@@ -413,13 +487,16 @@ class ReactAgenticLoop:
         
         state.tool_results = self.act_execute_tools(state, state.selected_tools)
         
+        # Tool results don't change across retries: format them once
+        state.tool_context = self.agent.format_tool_results(state.tool_results, state.country)
+        
         try:
             mark_phase_complete('phase_5_execution')
         except:
             pass
         
         # Phase 4: ITERATE - Synthesis + Validation Loop
-        self.printf("\n🔄 Phase 4: ITERATE - Synthesis + Validation...")
+        logger.debug("🔄 Phase 4: ITERATE - Synthesis + Validation...")
         
         # Mark synthesis phase as running
         try:
@@ -456,17 +533,12 @@ class ReactAgenticLoop:
                 pass
             
             if validation_result.get("passed", True):
-                self.printf(f"✅ Validation PASSED on attempt {attempt}")
+                logger.info("✅ Validation PASSED on attempt %d", attempt)
                 state.validation_passed = True
                 state.attempts = attempt
+                state.citations = self.await_citations(state)
                 state.final_response = self.finalize_response(response_text, state)
                 
-                # Fetch citations
-                state.citations = self.agent.get_citations_for_tools(
-                    state.country, 
-                    state.selected_tools
-                )
-                
                 return {
                     "response": state.final_response,
                     "validation": validation_result,
@@ -478,16 +550,16 @@ class ReactAgenticLoop:
                     "citations": state.citations
                 }
             else:
-                self.printf(f"❌ Validation FAILED on attempt {attempt}/{MAX_VALIDATION_ATTEMPTS}")
+                logger.info("❌ Validation FAILED on attempt %d/%d", attempt, MAX_VALIDATION_ATTEMPTS)
                 if attempt < MAX_VALIDATION_ATTEMPTS:
-                    self.printf("🔄 Retrying with validation feedback...")
+                    logger.debug("🔄 Retrying with validation feedback...")
                     continue
         
         # Max attempts reached - return best response
-        self.printf("⚠️ Max attempts reached. Using last response.")
+        logger.warning("⚠️ Max attempts reached. Using last response.")
         state.attempts = MAX_VALIDATION_ATTEMPTS
+        state.citations = self.await_citations(state)
         state.final_response = self.finalize_response(response_text, state)
-        state.citations = self.agent.get_citations_for_tools(state.country, state.selected_tools)
         
         return {
             "response": state.final_response,
@@ -500,8 +572,3 @@ class ReactAgenticLoop:
             "citations": state.citations
         }
 
-
-def printf(msg):
-    """Print with timestamp."""
-    print(f"{msg}")
-
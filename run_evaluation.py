@@ -35,7 +35,8 @@ def offline_eval(csv_path):
             country=country_code,
             query_string=row.get("query_str", row.get("query_string", "")),
             validation_mode="llm_judge",
-            enable_observability=True
+            enable_observability=True,
+            enable_progress=False
         )
         
         results.append({
@@ -72,7 +73,8 @@ def online_eval(query_str, user_id, country):
         country=country_code,
         query_string=query_str,
         validation_mode="llm_judge",
-        enable_observability=True
+        enable_observability=True,
+        enable_progress=False
     )
 
 if __name__ == "__main__":
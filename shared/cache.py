@@ -0,0 +1,272 @@
+"""
+shared.cache
+============
+
+Small in-process caching primitives shared across the agent pipeline.
+
+This module provides:
+- TTLCache: bounded, thread-safe LRU cache with per-entry time-to-live
+- SemanticCache: nearest-neighbour cache over embedding vectors
+- make_cache_key: fast content-addressed key from arbitrary parts
+- unit_vector: normalize an embedding so cosine similarity is a dot product
+
+Usage:
+    >>> from shared.cache import TTLCache, make_cache_key
+    >>>
+    >>> cache = TTLCache(maxsize=512, ttl=3600)
+    >>> key = make_cache_key("How much can I withdraw?", {"tax": {...}})
+    >>> cache.set(key, "cached value")
+    >>> cache.get(key)
+    'cached value'
+
+Author: Refactoring Team
+Date: 2024-11-24
+"""
+
+import hashlib
+import json
+import math
+import operator
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, List, Optional, Sequence
+
+
+_MISSING = object()
+
+
+def make_cache_key(*parts: Any) -> str:
+    """
+    Build a content-addressed cache key from arbitrary parts.
+
+    Strings are hashed as-is; everything else is canonicalized with
+    ``json.dumps(sort_keys=True)`` so dict ordering does not affect the key.
+
+    Args:
+        *parts: Values that together identify the cached computation
+
+    Returns:
+        32-character hex digest (BLAKE2b, 16-byte digest)
+
+    Examples:
+        >>> make_cache_key("q", {"b": 1, "a": 2}) == make_cache_key("q", {"a": 2, "b": 1})
+        True
+    """
+    hasher = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        if isinstance(part, str):
+            encoded = part.encode("utf-8")
+        else:
+            encoded = json.dumps(part, sort_keys=True, default=str).encode("utf-8")
+        hasher.update(encoded)
+        hasher.update(b"\x1f")  # Separator so ("ab", "c") != ("a", "bc")
+    return hasher.hexdigest()
+
+
+class TTLCache:
+    """
+    Bounded LRU cache whose entries expire after a fixed time-to-live.
+
+    Attributes:
+        maxsize: Maximum number of entries kept (least recently used evicted first)
+        ttl: Entry lifetime in seconds
+        hits: Number of successful lookups
+        misses: Number of failed or expired lookups
+    """
+
+    def __init__(self, maxsize: int = 512, ttl: float = 3600.0):
+        """
+        Initialize cache.
+
+        Args:
+            maxsize: Maximum number of entries
+            ttl: Entry lifetime in seconds
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Return the cached value for ``key``, or ``default`` if absent/expired.
+
+        Args:
+            key: Cache key
+            default: Value returned on miss
+
+        Returns:
+            Cached value or default
+        """
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """
+        Store ``value`` under ``key``, evicting the oldest entry if full.
+
+        Args:
+            key: Cache key
+            value: Value to store
+        """
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        """Remove ``key`` and return its value (or ``default``)."""
+        with self._lock:
+            entry = self._data.pop(key, _MISSING)
+            return default if entry is _MISSING else entry[1]
+
+    def clear(self) -> None:
+        """Remove all entries and reset hit/miss counters."""
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            return entry is not _MISSING and entry[0] >= time.monotonic()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+
+def unit_vector(vector: Sequence[float]) -> Optional[List[float]]:
+    """Return ``vector`` scaled to unit length (None for a zero vector)."""
+    norm = math.sqrt(sum(x * x for x in vector))
+    if norm == 0:
+        return None
+    return [x / norm for x in vector]
+
+
+class SemanticCache:
+    """
+    Cache keyed by embedding similarity instead of exact equality.
+
+    Entries are grouped by ``scope`` (e.g. member + settings) and only
+    compared within their scope. Vectors are normalized on insert so a
+    lookup is one dot product per stored entry.
+
+    Attributes:
+        threshold: Minimum cosine similarity for a hit
+        max_scopes: Maximum number of scopes kept (least recently used evicted)
+        per_scope: Maximum entries kept per scope (oldest evicted)
+        ttl: Entry lifetime in seconds
+        hits: Number of successful lookups
+        misses: Number of failed lookups
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.92,
+        max_scopes: int = 1024,
+        per_scope: int = 32,
+        ttl: float = 600.0
+    ):
+        """
+        Initialize cache.
+
+        Args:
+            threshold: Minimum cosine similarity for a hit
+            max_scopes: Maximum number of scopes
+            per_scope: Maximum entries per scope
+            ttl: Entry lifetime in seconds
+        """
+        self.threshold = threshold
+        self.max_scopes = max_scopes
+        self.per_scope = per_scope
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._scopes: "OrderedDict[Hashable, list]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, scope: Hashable, embedding: Sequence[float], default: Any = None) -> Any:
+        """
+        Return the value of the most similar live entry in ``scope``.
+
+        Args:
+            scope: Partition to search
+            embedding: Query embedding
+            default: Value returned when nothing reaches ``threshold``
+
+        Returns:
+            Cached value or default
+        """
+        query = unit_vector(embedding)
+        with self._lock:
+            entries = self._scopes.get(scope)
+            if not entries or query is None:
+                self.misses += 1
+                return default
+
+            now = time.monotonic()
+            entries[:] = [entry for entry in entries if entry[0] >= now]
+
+            best_score, best_value = self.threshold, _MISSING
+            for _, vector, value in entries:
+                score = sum(map(operator.mul, query, vector))
+                if score >= best_score:
+                    best_score, best_value = score, value
+
+            if best_value is _MISSING:
+                self.misses += 1
+                return default
+
+            self._scopes.move_to_end(scope)
+            self.hits += 1
+            return best_value
+
+    def set(self, scope: Hashable, embedding: Sequence[float], value: Any) -> None:
+        """
+        Store ``value`` under ``embedding`` within ``scope``.
+
+        Args:
+            scope: Partition to store in
+            embedding: Embedding of the cached input
+            value: Value to store
+        """
+        vector = unit_vector(embedding)
+        if vector is None:
+            return
+        with self._lock:
+            entries = self._scopes.setdefault(scope, [])
+            entries.append((time.monotonic() + self.ttl, vector, value))
+            del entries[:-self.per_scope]
+            self._scopes.move_to_end(scope)
+            while len(self._scopes) > self.max_scopes:
+                self._scopes.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove all entries and reset hit/miss counters."""
+        with self._lock:
+            self._scopes.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(len(entries) for entries in self._scopes.values())
@@ -10,6 +10,7 @@ This module provides:
 - Structured log formatting with timestamps
 - Environment-based log level configuration
 - Thread-safe logger instances
+- Optional non-blocking output (QueueHandler + background QueueListener)
 
 Usage:
     >>> from shared.logging_config import get_logger
@@ -21,9 +22,11 @@ Author: Refactoring Team
 Date: 2024-11-24
 """
 
+import atexit
 import logging
+import queue
 import sys
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
 from typing import Optional, Dict
 from datetime import datetime
@@ -149,6 +152,7 @@ def setup_logging(
     backup_count: int = 5,
     enable_console: bool = True,
     enable_file: bool = True,
+    non_blocking: bool = False,
 ) -> None:
     """
     Configure root logger with console and file handlers.
@@ -160,6 +164,8 @@ def setup_logging(
         backup_count: Number of backup files to keep (default: 5)
         enable_console: Whether to log to console (default: True)
         enable_file: Whether to log to file (default: True)
+        non_blocking: Route records through a queue so console/file writes
+            happen on a background thread instead of the caller's (default: False)
 
     Raises:
         ValueError: If both console and file logging are disabled
@@ -168,6 +174,7 @@ def setup_logging(
     Examples:
         >>> setup_logging(log_level=logging.DEBUG)
         >>> setup_logging(log_file="custom.log", max_bytes=5_000_000)
+        >>> setup_logging(non_blocking=True)  # Request threads never block on stdout
     """
     if not enable_console and not enable_file:
         raise ValueError("At least one of console or file logging must be enabled")
@@ -180,8 +187,10 @@ def setup_logging(
     root_logger = logging.getLogger()
     root_logger.setLevel(log_level)
 
-    # Clear existing handlers to avoid duplicates
+    # Clear existing handlers (and any previous queue listener) to avoid duplicates
     root_logger.handlers.clear()
+    _stop_queue_listener()
+    handlers = []
 
     # Console handler with colors
     if enable_console:
@@ -193,7 +202,7 @@ def setup_logging(
             datefmt="%Y-%m-%d %H:%M:%S",
         )
         console_handler.setFormatter(console_format)
-        root_logger.addHandler(console_handler)
+        handlers.append(console_handler)
 
     # File handler with rotation
     if enable_file:
@@ -218,7 +227,32 @@ def setup_logging(
             datefmt="%Y-%m-%d %H:%M:%S",
         )
         file_handler.setFormatter(file_format)
-        root_logger.addHandler(file_handler)
+        handlers.append(file_handler)
+
+    if non_blocking:
+        global _queue_listener
+        log_queue = queue.SimpleQueue()
+        _queue_listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+        _queue_listener.start()
+        root_logger.addHandler(QueueHandler(log_queue))
+    else:
+        for handler in handlers:
+            root_logger.addHandler(handler)
+
+
+# Background listener behind the root QueueHandler (setup_logging(non_blocking=True))
+_queue_listener: Optional[QueueListener] = None
+
+
+def _stop_queue_listener() -> None:
+    """Flush and stop the background listener, if one is running."""
+    global _queue_listener
+    if _queue_listener is not None:
+        _queue_listener.stop()
+        _queue_listener = None
+
+
+atexit.register(_stop_queue_listener)
 
 
 def get_logger(name: str) -> logging.Logger:
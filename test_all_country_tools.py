@@ -152,7 +152,8 @@ def run_test(test_case):
             country=country,
             query_string=query,
             validation_mode="llm",
-            enable_observability=False
+            enable_observability=False,
+            enable_progress=False
         )
 
         # Check if error
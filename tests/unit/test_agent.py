@@ -0,0 +1,194 @@
+"""
+Unit tests for agent module.
+
+Tests cover:
+- Exact-match result cache in process_query
+- In-process citation index (shared load, retry window, refresh)
+
+Author: Refactoring Team
+Date: 2024-11-24
+"""
+
+import pytest
+from unittest.mock import Mock
+
+from databricks.sdk.service.sql import StatementState
+
+import agent as agent_module
+from agent import SuperAdvisorAgent
+
+
+# ============================================================================
+# FIXTURES
+# ============================================================================
+
+@pytest.fixture(autouse=True)
+def clear_agent_caches():
+    """Reset module-level caches so tests do not leak results."""
+    agent_module._result_cache.clear()
+    agent_module._citation_cache.clear()
+    agent_module._citations_section_cache.clear()
+    yield
+    agent_module._result_cache.clear()
+    agent_module._citation_cache.clear()
+    agent_module._citations_section_cache.clear()
+
+
+@pytest.fixture
+def clean_citation_index(monkeypatch):
+    """Start each citation test with no shared index loaded."""
+    monkeypatch.setattr(agent_module, "_citation_index", None)
+    monkeypatch.setattr(agent_module, "_citation_index_loaded_at", 0.0)
+    monkeypatch.setattr(agent_module, "_citation_index_failed_at", None)
+
+
+def _statement_result(state, rows=None):
+    """Build a mocked execute_statement response."""
+    result = Mock()
+    result.status.state = state
+    result.result.data_array = rows
+    return result
+
+
+CITATION_ROWS = [
+    ["AU-TAX-001", "AU", "ATO", "Income Tax Act", "ITAA-1997", "https://ato.gov.au", "Tax", "tax"],
+    ["AU-PRES-001", "AU", "APRA", "SIS Regulations", "SIS-6.01", "https://apra.gov.au", "Age", "preservation"],
+]
+
+
+@pytest.fixture
+def advisor():
+    """SuperAdvisorAgent with mocked collaborators (no Databricks calls)."""
+    instance = SuperAdvisorAgent.__new__(SuperAdvisorAgent)
+    instance.w = Mock()
+    instance.enable_result_cache = True
+    instance.enable_semantic_cache = False
+    instance.main_llm_endpoint = "test-endpoint"
+    instance.validation_mode = "llm_judge"
+    instance.tools = Mock()
+    instance.tools.get_member_profile.return_value = {
+        "member_id": "M001", "country": "AU", "name": "Jane Doe"
+    }
+    instance.context_formatter = Mock()
+    instance.context_formatter.build_base_context.return_value = {
+        "text": "context", "anonymized_name": "Member_abc123", "needs_restore": True
+    }
+    instance.react_loop = Mock()
+    instance.react_loop.run_agentic_loop.return_value = {
+        "response": "answer",
+        "validation": {"passed": True},
+        "synthesis_results": [{"cost": 0.01}],
+        "validation_results": [{"passed": True}],
+        "attempts": 1,
+    }
+    return instance
+
+
+# ============================================================================
+# RESULT CACHE TESTS
+# ============================================================================
+
+class TestResultCache:
+    """Test suite for the process_query exact-match result cache."""
+
+    def test_cache_hit_skips_pipeline(self, advisor):
+        """Test that a repeated query is served from cache without new work."""
+        first = advisor.process_query("M001", "Can I withdraw my super?")
+        second = advisor.process_query("M001", "  can I withdraw my SUPER?  ")
+
+        assert advisor.tools.get_member_profile.call_count == 1
+        assert advisor.react_loop.run_agentic_loop.call_count == 1
+        assert "cached" not in first
+        assert second["cached"] is True
+        assert second["response"] == "answer"
+        assert second["synthesis_results"] == []
+        assert second["validation_results"] == []
+
+    def test_failed_validation_not_cached(self, advisor):
+        """Test that answers which failed validation are not stored."""
+        advisor.react_loop.run_agentic_loop.return_value = {
+            "response": "answer",
+            "validation": {"passed": False},
+            "attempts": 3,
+        }
+
+        advisor.process_query("M001", "Can I withdraw my super?")
+        result = advisor.process_query("M001", "Can I withdraw my super?")
+
+        assert advisor.react_loop.run_agentic_loop.call_count == 2
+        assert "cached" not in result
+
+    def test_cache_disabled_bypasses_cache(self, advisor):
+        """Test that enable_result_cache=False always runs the pipeline."""
+        advisor.enable_result_cache = False
+
+        advisor.process_query("M001", "Can I withdraw my super?")
+        result = advisor.process_query("M001", "Can I withdraw my super?")
+
+        assert advisor.tools.get_member_profile.call_count == 2
+        assert advisor.react_loop.run_agentic_loop.call_count == 2
+        assert "cached" not in result
+        assert len(agent_module._result_cache) == 0
+
+
+# ============================================================================
+# CITATION INDEX TESTS
+# ============================================================================
+
+@pytest.mark.usefixtures("clean_citation_index")
+class TestCitationIndex:
+    """Test suite for the shared in-process citation index."""
+
+    def test_single_load_shared_by_lookups(self, advisor):
+        """Test that one registry load serves repeated lookups."""
+        advisor.w.statement_execution.execute_statement.return_value = _statement_result(
+            StatementState.SUCCEEDED, CITATION_ROWS
+        )
+
+        tax = advisor.get_citations_for_tools("au", ["tax"])
+        both = advisor.get_citations_for_tools("AU", ["tax", "preservation"])
+
+        assert advisor.w.statement_execution.execute_statement.call_count == 1
+        assert [c["citation_id"] for c in tax] == ["AU-TAX-001"]
+        assert [c["citation_id"] for c in both] == ["AU-PRES-001", "AU-TAX-001"]
+
+    def test_failed_load_falls_back_to_query(self, advisor, monkeypatch):
+        """Test that lookups use the per-request query inside the retry window."""
+        advisor.w.statement_execution.execute_statement.return_value = _statement_result(
+            StatementState.FAILED
+        )
+        advisor._query_citations = Mock(return_value=[{"citation_id": "AU-TAX-001"}])
+
+        first = advisor.get_citations_for_tools("AU", ["tax"])
+        second = advisor.get_citations_for_tools("AU", ["preservation"])
+
+        # Only the first lookup attempts the index; the second is inside the window
+        assert advisor.w.statement_execution.execute_statement.call_count == 1
+        assert agent_module._citation_index_failed_at is not None
+        assert advisor._query_citations.call_count == 2
+        assert first == [{"citation_id": "AU-TAX-001"}]
+        assert second == [{"citation_id": "AU-TAX-001"}]
+
+        # Once the window has passed the index load is retried
+        monkeypatch.setattr(
+            agent_module, "_citation_index_failed_at",
+            agent_module._citation_index_failed_at - agent_module.CITATION_INDEX_RETRY_SECONDS - 1
+        )
+        advisor.get_citations_for_tools("AU", ["tax"])
+        assert advisor.w.statement_execution.execute_statement.call_count == 2
+
+    def test_refresh_citations_forces_reload(self, advisor):
+        """Test that refresh_citations reloads a fresh index."""
+        advisor.w.statement_execution.execute_statement.return_value = _statement_result(
+            StatementState.SUCCEEDED, CITATION_ROWS[:1]
+        )
+        assert advisor.get_citations_for_tools("AU", ["preservation"]) == []
+
+        advisor.w.statement_execution.execute_statement.return_value = _statement_result(
+            StatementState.SUCCEEDED, CITATION_ROWS
+        )
+        assert advisor.refresh_citations() is True
+
+        citations = advisor.get_citations_for_tools("AU", ["preservation"])
+        assert advisor.w.statement_execution.execute_statement.call_count == 2
+        assert [c["citation_id"] for c in citations] == ["AU-PRES-001"]
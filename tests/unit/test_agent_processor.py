@@ -0,0 +1,335 @@
+"""
+Unit tests for agent_processor module.
+
+Tests cover:
+- Governance INSERT status checking, retry and disk spill
+- Owner-only spill file and its replay
+- Batched writer thread and close() draining
+- GOVERNANCE_SYNC_WRITES running phase 8 on the request thread
+- Governance event_id deduplication
+- Audit rows for result-cache hits
+
+Author: Refactoring Team
+Date: 2024-11-24
+"""
+
+import json
+import pytest
+from datetime import datetime
+from unittest.mock import Mock, patch
+
+from databricks.sdk.service.sql import StatementState
+
+import agent_processor
+from agent_processor import AuditLogger
+
+
+# ============================================================================
+# FIXTURES
+# ============================================================================
+
+def _statement(state, error_message=None):
+    """Build a mocked execute_statement response."""
+    result = Mock()
+    result.status.state = state
+    result.status.error = Mock(message=error_message) if error_message else None
+    return result
+
+
+@pytest.fixture
+def mock_client():
+    """WorkspaceClient whose statements succeed unless a test says otherwise."""
+    client = Mock()
+    client.statement_execution.execute_statement.return_value = _statement(StatementState.SUCCEEDED)
+    return client
+
+
+@pytest.fixture
+def spill_path(tmp_path, monkeypatch):
+    """Redirect the governance spill file into the test's temp directory."""
+    path = tmp_path / "governance_spill.jsonl"
+    monkeypatch.setattr(agent_processor, "GOVERNANCE_SPILL_PATH", str(path))
+    monkeypatch.setattr(agent_processor, "GOVERNANCE_RETRY_BASE_SECONDS", 0)
+    return path
+
+
+@pytest.fixture
+def audit_logger(mock_client, spill_path, monkeypatch):
+    """AuditLogger with MLflow disabled and a mocked warehouse client."""
+    monkeypatch.setattr(agent_processor, "MLFLOW_ENABLED", False)
+    with patch("agent_processor.get_workspace_client", return_value=mock_client):
+        instance = AuditLogger()
+    instance.warehouse_id = "wh-1"
+    # Let the writer's startup replay finish before the test touches the spill file
+    instance._startup_replay_done.wait(5.0)
+    yield instance
+    instance.close(timeout=5.0)
+
+
+def _row(event_id="evt-1"):
+    """A governance row in GOVERNANCE_COLUMNS order."""
+    values = {
+        "event_id": event_id, "timestamp": "2024-11-24T00:00:00+00:00", "user_id": "user",
+        "session_id": "session", "country": "AU", "query_string": "question",
+        "agent_response": "answer", "result_preview": "answer", "cost": 0.01,
+        "citations": "[]", "tool_used": "tax", "judge_response": "{}",
+        "judge_verdict": "PASS", "error_info": "", "validation_mode": "llm_judge",
+        "validation_attempts": 1, "total_time_seconds": 1.5,
+    }
+    return tuple(values[name] for name in agent_processor.GOVERNANCE_COLUMN_NAMES)
+
+
+# ============================================================================
+# GOVERNANCE WRITE TESTS
+# ============================================================================
+
+class TestGovernanceWrites:
+    """Test suite for batched governance INSERTs."""
+
+    def test_failed_statement_is_retried_then_spilled(self, audit_logger, mock_client, spill_path):
+        """Test that a FAILED INSERT status goes through retry and spill."""
+        mock_client.statement_execution.execute_statement.return_value = _statement(
+            StatementState.FAILED, "TABLE_OR_VIEW_NOT_FOUND"
+        )
+
+        audit_logger._write_governance_batch([_row()])
+
+        assert (
+            mock_client.statement_execution.execute_statement.call_count
+            == agent_processor.GOVERNANCE_MAX_RETRIES
+        )
+        spilled = [json.loads(line) for line in spill_path.read_text().splitlines()]
+        assert [entry["event_id"] for entry in spilled] == ["evt-1"]
+
+    def test_queued_rows_share_one_insert(self, audit_logger, mock_client):
+        """Test that rows queued together are written by one multi-row INSERT."""
+        # Hold the queue lock so the writer thread sees all rows at once
+        with audit_logger._pending:
+            for i in range(3):
+                audit_logger._enqueue_governance_row(_row(f"evt-{i}"))
+        audit_logger.close(timeout=5.0)
+
+        mock_client.statement_execution.execute_statement.assert_called_once()
+        kwargs = mock_client.statement_execution.execute_statement.call_args.kwargs
+        assert kwargs["statement"] == agent_processor._governance_insert_sql(3)
+        assert len(kwargs["parameters"]) == 3 * len(agent_processor.GOVERNANCE_COLUMNS)
+        assert kwargs["parameters"][0].value == "evt-0"
+
+    def test_exhausted_retries_spill_rows(self, audit_logger, mock_client, spill_path):
+        """Test that rows are spilled as JSON lines after every retry fails."""
+        mock_client.statement_execution.execute_statement.side_effect = Exception("warehouse down")
+
+        audit_logger._write_governance_batch([_row("evt-1"), _row("evt-2")])
+
+        assert (
+            mock_client.statement_execution.execute_statement.call_count
+            == agent_processor.GOVERNANCE_MAX_RETRIES
+        )
+        spilled = [json.loads(line) for line in spill_path.read_text().splitlines()]
+        assert [entry["event_id"] for entry in spilled] == ["evt-1", "evt-2"]
+        assert set(spilled[0]) == set(agent_processor.GOVERNANCE_COLUMN_NAMES)
+        assert spilled[0]["cost"] == 0.01
+
+    def test_close_drains_pending_rows(self, audit_logger, mock_client, spill_path):
+        """Test that close() writes every queued row before the writer stops."""
+        row_count = agent_processor.GOVERNANCE_BATCH_SIZE + 2
+        with audit_logger._pending:
+            for i in range(row_count):
+                audit_logger._enqueue_governance_row(_row(f"evt-{i}"))
+        audit_logger.close(timeout=5.0)
+
+        calls = mock_client.statement_execution.execute_statement.call_args_list
+        written = sum(
+            len(call.kwargs["parameters"]) // len(agent_processor.GOVERNANCE_COLUMNS)
+            for call in calls
+        )
+        assert written == row_count
+        assert len(calls) == 2
+        assert not audit_logger._pending_rows
+        assert not audit_logger._writer.is_alive()
+        assert not spill_path.exists()
+
+    def test_spill_file_is_owner_only(self, audit_logger, spill_path):
+        """Test that the spill file is created readable by the owner only."""
+        audit_logger._spill_governance_rows([_row()])
+
+        assert spill_path.stat().st_mode & 0o777 == 0o600
+
+    def test_replay_reinserts_spilled_rows(self, audit_logger, mock_client, spill_path):
+        """Test that spilled rows are re-inserted and the spill file removed."""
+        audit_logger._spill_governance_rows([_row("evt-1"), _row("evt-2")])
+
+        assert audit_logger.replay_governance_spill() == 2
+
+        mock_client.statement_execution.execute_statement.assert_called_once()
+        kwargs = mock_client.statement_execution.execute_statement.call_args.kwargs
+        assert kwargs["statement"] == agent_processor._governance_insert_sql(2)
+        assert kwargs["parameters"][0].value == "evt-1"
+        assert not spill_path.exists()
+        assert not (spill_path.parent / (spill_path.name + ".replay")).exists()
+
+    def test_replay_respills_failed_rows(self, audit_logger, mock_client, spill_path):
+        """Test that rows failing again during replay are kept for the next one."""
+        audit_logger._spill_governance_rows([_row("evt-1")])
+        mock_client.statement_execution.execute_statement.side_effect = Exception("warehouse down")
+
+        audit_logger.replay_governance_spill()
+
+        spilled = [json.loads(line) for line in spill_path.read_text().splitlines()]
+        assert [entry["event_id"] for entry in spilled] == ["evt-1"]
+
+    def test_timestamp_is_naive_utc(self, audit_logger, mock_client, monkeypatch):
+        """Test that the row timestamp keeps the documented offset-free format."""
+        monkeypatch.setattr(agent_processor, "GOVERNANCE_SYNC_WRITES", True)
+
+        audit_logger.log_to_governance_table(
+            session_id="session", user_id="user", country="AU", query_string="question",
+            answer="answer", judge_verdict={"verdict": "Pass"}, tools_called=["tax"],
+            cost=0.01, citations=[], elapsed=1.5, event_id="evt-1"
+        )
+
+        parameters = mock_client.statement_execution.execute_statement.call_args.kwargs["parameters"]
+        timestamp = parameters[agent_processor.GOVERNANCE_COLUMN_NAMES.index("timestamp")].value
+        assert datetime.fromisoformat(timestamp).tzinfo is None
+
+    def test_duplicate_event_id_is_dropped(self, audit_logger, mock_client, monkeypatch):
+        """Test that a repeated event_id is skipped while a new one is written."""
+        monkeypatch.setattr(agent_processor, "GOVERNANCE_SYNC_WRITES", True)
+        row_kwargs = dict(
+            session_id="session", user_id="user", country="AU", query_string="question",
+            answer="answer", judge_verdict={"verdict": "Pass"}, tools_called=["tax"],
+            cost=0.01, citations=[], elapsed=1.5
+        )
+
+        audit_logger.log_to_governance_table(event_id="evt-1", **row_kwargs)
+        audit_logger.log_to_governance_table(event_id="evt-1", **row_kwargs)
+        audit_logger.log_to_governance_table(event_id="evt-2", **row_kwargs)
+
+        calls = mock_client.statement_execution.execute_statement.call_args_list
+        assert [call.kwargs["parameters"][0].value for call in calls] == ["evt-1", "evt-2"]
+
+
+# ============================================================================
+# SYNCHRONOUS AUDIT MODE TESTS
+# ============================================================================
+
+@pytest.fixture
+def pipeline(monkeypatch):
+    """Patch agent_query's collaborators so only its phase-8 wiring runs."""
+    monkeypatch.setattr(agent_processor, "MLFLOW_ENABLED", False)
+    mock_agent = Mock()
+    mock_agent.process_query.return_value = {
+        "response": "answer",
+        "tools_used": ["tax"],
+        "citations": [],
+        "classification": {"method": "embedding"},
+        "synthesis_results": [],
+        "validation_results": [],
+    }
+    mock_audit_logger = Mock()
+    mock_executor = Mock()
+    monkeypatch.setattr(agent_processor, "get_agent", Mock(return_value=mock_agent))
+    monkeypatch.setattr(agent_processor, "get_audit_logger", Mock(return_value=mock_audit_logger))
+    monkeypatch.setattr(agent_processor, "_audit_executor", mock_executor)
+    return mock_agent, mock_audit_logger, mock_executor
+
+
+def _run_query():
+    return agent_processor.agent_query(
+        "M001", "session", "AU", "Can I withdraw my super?",
+        enable_observability=False, enable_progress=False
+    )
+
+
+class TestSyncGovernanceWrites:
+    """Test suite for GOVERNANCE_SYNC_WRITES in agent_query."""
+
+    def test_sync_mode_writes_before_returning(self, pipeline, monkeypatch):
+        """Test that the governance row is written on the request thread."""
+        monkeypatch.setattr(agent_processor, "GOVERNANCE_SYNC_WRITES", True)
+        _, mock_audit_logger, mock_executor = pipeline
+
+        result = _run_query()
+
+        assert result["answer"] == "answer"
+        mock_executor.submit.assert_not_called()
+        mock_audit_logger.log_to_governance_table.assert_called_once()
+        assert mock_audit_logger.log_to_governance_table.call_args.kwargs["classification_method"] == "embedding"
+
+    def test_sync_mode_writes_error_row_before_returning(self, pipeline, monkeypatch):
+        """Test that the error-path row is also written on the request thread."""
+        monkeypatch.setattr(agent_processor, "GOVERNANCE_SYNC_WRITES", True)
+        mock_agent, mock_audit_logger, mock_executor = pipeline
+        mock_agent.process_query.side_effect = RuntimeError("boom")
+
+        result = _run_query()
+
+        assert result["judge_verdict"]["verdict"] == "ERROR"
+        mock_executor.submit.assert_not_called()
+        mock_audit_logger.log_to_governance_table.assert_called_once()
+        assert mock_audit_logger.log_to_governance_table.call_args.kwargs["classification_method"] == "error"
+
+    def test_default_mode_defers_to_audit_pool(self, pipeline, monkeypatch):
+        """Test that phase 8 is queued on the audit pool by default."""
+        monkeypatch.setattr(agent_processor, "GOVERNANCE_SYNC_WRITES", False)
+        _, mock_audit_logger, mock_executor = pipeline
+
+        _run_query()
+
+        mock_executor.submit.assert_called_once()
+        assert mock_executor.submit.call_args.args[0] is agent_processor._async_audit_logging
+        mock_audit_logger.log_to_governance_table.assert_not_called()
+
+
+# ============================================================================
+# CACHE HIT AUDIT TESTS
+# ============================================================================
+
+class TestCacheHitAudit:
+    """Test suite for governance rows of answers served from the result cache."""
+
+    def test_cache_hit_row_reports_stored_verdict(self, pipeline, monkeypatch):
+        """Test that a cache hit is audited with its original judge verdict."""
+        monkeypatch.setattr(agent_processor, "GOVERNANCE_SYNC_WRITES", True)
+        mock_agent, mock_audit_logger, _ = pipeline
+        mock_agent.process_query.return_value = {
+            "response": "answer",
+            "tools_used": ["tax"],
+            "citations": [],
+            "classification": {"method": "embedding"},
+            "validation": {"passed": True, "confidence": 0.9, "reasoning": "Accurate", "violations": []},
+            "attempts": 2,
+            "synthesis_results": [],
+            "validation_results": [],
+            "cached": True,
+        }
+
+        result = _run_query()
+
+        kwargs = mock_audit_logger.log_to_governance_table.call_args.kwargs
+        verdict = kwargs["judge_verdict"]
+        assert verdict["verdict"] == "Pass"
+        assert verdict["confidence"] == 0.9
+        assert verdict["reasoning"] == "Accurate"
+        assert verdict["attempts"] == 2
+        assert verdict["cache_hit"] is True
+        assert kwargs["classification_method"] == "result_cache"
+        assert kwargs["cost"] == 0.0
+        assert result["judge_verdict"]["cache_hit"] is True
+
+    def test_cache_hit_marked_in_judge_response(self, audit_logger, mock_client, monkeypatch):
+        """Test that the written governance row flags the cache hit."""
+        monkeypatch.setattr(agent_processor, "GOVERNANCE_SYNC_WRITES", True)
+
+        audit_logger.log_to_governance_table(
+            session_id="session", user_id="user", country="AU", query_string="question",
+            answer="answer", judge_verdict={"verdict": "Pass", "confidence": 0.9, "cache_hit": True},
+            tools_called=["tax"], cost=0.0, citations=[], elapsed=0.1,
+            classification_method="result_cache", event_id="evt-1"
+        )
+
+        parameters = mock_client.statement_execution.execute_statement.call_args.kwargs["parameters"]
+        judge_response = json.loads(
+            parameters[agent_processor.GOVERNANCE_COLUMN_NAMES.index("judge_response")].value
+        )
+        assert judge_response == {"reasoning": "", "confidence": 0.9, "cache_hit": True}
@@ -0,0 +1,133 @@
+"""
+Unit tests for shared.cache module.
+
+Tests cover:
+- Content-addressed key generation
+- TTLCache hit/miss accounting
+- LRU eviction
+- Entry expiry
+- SemanticCache similarity lookups
+
+Author: Refactoring Team
+Date: 2024-11-24
+"""
+
+import pytest
+from unittest.mock import patch
+
+from shared.cache import SemanticCache, TTLCache, make_cache_key, unit_vector
+
+
+class TestMakeCacheKey:
+    """Test suite for make_cache_key."""
+
+    def test_key_is_stable(self):
+        """Test that identical parts produce identical keys."""
+        assert make_cache_key("query", {"tax": 1}) == make_cache_key("query", {"tax": 1})
+
+    def test_key_ignores_dict_order(self):
+        """Test that dict key order does not change the key."""
+        key1 = make_cache_key({"a": 1, "b": 2})
+        key2 = make_cache_key({"b": 2, "a": 1})
+        assert key1 == key2
+
+    def test_key_separates_parts(self):
+        """Test that part boundaries are part of the key."""
+        assert make_cache_key("ab", "c") != make_cache_key("a", "bc")
+
+
+class TestTTLCache:
+    """Test suite for TTLCache."""
+
+    def test_get_and_set(self):
+        """Test basic get/set and hit/miss counters."""
+        cache = TTLCache(maxsize=4, ttl=60)
+
+        assert cache.get("missing") is None
+        cache.set("key", "value")
+
+        assert cache.get("key") == "value"
+        assert "key" in cache
+        assert cache.hits == 1
+        assert cache.misses == 1
+
+    def test_lru_eviction(self):
+        """Test that least recently used entries are evicted first."""
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")  # "b" is now least recently used
+        cache.set("c", 3)
+
+        assert "a" in cache
+        assert "b" not in cache
+        assert len(cache) == 2
+
+    def test_entries_expire(self):
+        """Test that entries past their TTL are treated as misses."""
+        cache = TTLCache(maxsize=4, ttl=10)
+
+        with patch('shared.cache.time.monotonic', return_value=100.0):
+            cache.set("key", "value")
+        with patch('shared.cache.time.monotonic', return_value=111.0):
+            assert cache.get("key") is None
+
+        assert len(cache) == 0
+
+    def test_clear(self):
+        """Test that clear drops entries and counters."""
+        cache = TTLCache(maxsize=4, ttl=60)
+        cache.set("key", "value")
+        cache.get("key")
+        cache.clear()
+
+        assert len(cache) == 0
+        assert cache.hits == 0
+
+
+
+class TestSemanticCache:
+    """Test suite for SemanticCache."""
+
+    def test_similar_embedding_hits(self):
+        """Test that a near-identical embedding returns the stored value."""
+        cache = SemanticCache(threshold=0.9)
+        cache.set("member-1", [1.0, 0.0, 0.0], "answer")
+
+        assert cache.get("member-1", [0.99, 0.05, 0.0]) == "answer"
+        assert cache.hits == 1
+
+    def test_dissimilar_embedding_misses(self):
+        """Test that an unrelated embedding is a miss."""
+        cache = SemanticCache(threshold=0.9)
+        cache.set("member-1", [1.0, 0.0, 0.0], "answer")
+
+        assert cache.get("member-1", [0.0, 1.0, 0.0]) is None
+        assert cache.misses == 1
+
+    def test_scopes_are_isolated(self):
+        """Test that entries are never returned for another scope."""
+        cache = SemanticCache(threshold=0.9)
+        cache.set("member-1", [1.0, 0.0], "answer")
+
+        assert cache.get("member-2", [1.0, 0.0]) is None
+
+    def test_per_scope_limit(self):
+        """Test that only the newest entries per scope are kept."""
+        cache = SemanticCache(threshold=0.9, per_scope=2)
+        cache.set("m", [1.0, 0.0, 0.0], "a")
+        cache.set("m", [0.0, 1.0, 0.0], "b")
+        cache.set("m", [0.0, 0.0, 1.0], "c")
+
+        assert len(cache) == 2
+        assert cache.get("m", [1.0, 0.0, 0.0]) is None
+
+
+def test_unit_vector():
+    """Test normalization and the zero-vector case."""
+    assert unit_vector([3.0, 4.0]) == pytest.approx([0.6, 0.8])
+    assert unit_vector([0.0, 0.0]) is None
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -45,7 +45,7 @@ class TestAnonymization:
     """Test suite for name anonymization methods."""
 
     def test_anonymize_member_name_creates_hash(self):
-        """Test that anonymize_member_name creates consistent MD5 hash."""
+        """Test that anonymize_member_name creates a consistent hash."""
         formatter = ContextFormatter()
         name = "John Smith"
 
@@ -58,9 +58,10 @@ class TestAnonymization:
         anonymized2 = formatter.anonymize_member_name(name)
         assert anonymized == anonymized2
 
-        # Hash should be 6 characters
+        # Hash should be 6 hex characters
         hash_part = anonymized.replace("Member_", "")
         assert len(hash_part) == 6
+        assert all(c in "0123456789abcdef" for c in hash_part)
 
     def test_anonymize_member_name_different_names(self):
         """Test that different names produce different hashes."""
@@ -256,6 +257,7 @@ class TestBaseContext:
         # Check values
         assert context_data["real_name"] == "John Smith"
         assert context_data["anonymized_name"].startswith("Member_")
+        assert context_data["needs_restore"] is True
 
         # Check text content
         text = context_data["text"]
@@ -284,8 +286,9 @@ class TestBaseContext:
 
         context_data = formatter.build_base_context(member_profile, anonymize=False)
 
-        # anonymized_name should be None
+        # anonymized_name should be None and nothing to restore
         assert context_data["anonymized_name"] is None
+        assert context_data["needs_restore"] is False
 
         # Text should contain real name
         text = context_data["text"]
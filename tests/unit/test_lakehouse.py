@@ -0,0 +1,165 @@
+"""
+Unit tests for utils.lakehouse module.
+
+Tests cover:
+- Shared WorkspaceClient construction
+- SQL query execution into DataFrames
+- Bound statement parameters
+- Failed statement handling
+- Citation lookups by id
+
+Author: Refactoring Team
+Date: 2024-11-24
+"""
+
+import pytest
+from unittest.mock import Mock, patch
+
+from databricks.sdk.service.sql import StatementState, StatementParameterListItem
+
+import utils.lakehouse as lakehouse
+from utils.lakehouse import execute_sql_query, execute_sql_statement, get_citations
+
+
+# ============================================================================
+# FIXTURES
+# ============================================================================
+
+def _statement(state, rows=None, columns=()):
+    """Build a mocked statement execution response."""
+    statement = Mock()
+    statement.status.state = state
+    statement.result.data_array = rows
+    statement.manifest.schema.columns = [Mock() for _ in columns]
+    for column, name in zip(statement.manifest.schema.columns, columns):
+        column.name = name
+    return statement
+
+
+@pytest.fixture
+def mock_client():
+    """Patch the shared WorkspaceClient used by utils.lakehouse."""
+    client = Mock()
+    with patch("utils.lakehouse.get_workspace_client", return_value=client):
+        yield client
+
+
+# ============================================================================
+# WORKSPACE CLIENT TESTS
+# ============================================================================
+
+class TestGetWorkspaceClient:
+    """Test suite for get_workspace_client."""
+
+    def test_builds_client_with_http_settings(self, monkeypatch):
+        """Test that the real SDK client is built with the pooled HTTP settings."""
+        # PAT auth resolves locally, so no network call is made
+        monkeypatch.setenv("DATABRICKS_HOST", "https://example.cloud.databricks.com")
+        monkeypatch.setenv("DATABRICKS_TOKEN", "dapi-test-token")
+        monkeypatch.delenv("DATABRICKS_CONFIG_PROFILE", raising=False)
+        monkeypatch.setattr(lakehouse, "_workspace_client", None)
+
+        client = lakehouse.get_workspace_client()
+
+        assert client.config.http_timeout_seconds == lakehouse.WORKSPACE_HTTP_TIMEOUT_SECONDS
+        assert client.config.retry_timeout_seconds == lakehouse.WORKSPACE_RETRY_TIMEOUT_SECONDS
+        assert client.config.max_connection_pools == lakehouse.WORKSPACE_MAX_CONNECTION_POOLS
+        assert client.config.max_connections_per_pool == lakehouse.WORKSPACE_MAX_CONNECTIONS_PER_POOL
+        assert lakehouse.get_workspace_client() is client
+
+
+# ============================================================================
+# EXECUTE_SQL_QUERY TESTS
+# ============================================================================
+
+class TestExecuteSqlQuery:
+    """Test suite for execute_sql_query."""
+
+    def test_returns_dataframe(self, mock_client):
+        """Test that result rows are returned as a DataFrame."""
+        mock_client.statement_execution.execute_statement.return_value = _statement(
+            StatementState.SUCCEEDED, [["M001", "AU"]], ("member_id", "country")
+        )
+
+        df = execute_sql_query("SELECT member_id, country FROM members", warehouse_id="wh-1")
+
+        assert list(df.columns) == ["member_id", "country"]
+        assert df.iloc[0].to_dict() == {"member_id": "M001", "country": "AU"}
+        kwargs = mock_client.statement_execution.execute_statement.call_args.kwargs
+        assert kwargs["warehouse_id"] == "wh-1"
+        assert kwargs["parameters"] is None
+
+    def test_forwards_parameters(self, mock_client):
+        """Test that bound parameters are passed to the statement API."""
+        mock_client.statement_execution.execute_statement.return_value = _statement(
+            StatementState.SUCCEEDED
+        )
+        parameters = [StatementParameterListItem(name="member_id", value="M001")]
+
+        df = execute_sql_query(
+            "SELECT * FROM members WHERE member_id = :member_id",
+            warehouse_id="wh-1",
+            parameters=parameters
+        )
+
+        assert df.empty
+        kwargs = mock_client.statement_execution.execute_statement.call_args.kwargs
+        assert kwargs["parameters"] == parameters
+
+    def test_failed_statement_raises(self, mock_client):
+        """Test that a failed statement raises an SQL execution error."""
+        mock_client.statement_execution.execute_statement.return_value = _statement(
+            StatementState.FAILED
+        )
+
+        with pytest.raises(Exception, match="SQL execution error"):
+            execute_sql_query("SELECT 1", warehouse_id="wh-1")
+
+    def test_missing_warehouse_raises(self, mock_client):
+        """Test that an unconfigured warehouse is rejected before any call."""
+        with pytest.raises(ValueError, match="not configured"):
+            execute_sql_query("SELECT 1", warehouse_id="YOUR_WAREHOUSE_ID_HERE")
+
+        mock_client.statement_execution.execute_statement.assert_not_called()
+
+
+# ============================================================================
+# EXECUTE_SQL_STATEMENT / CITATION TESTS
+# ============================================================================
+
+class TestExecuteSqlStatement:
+    """Test suite for execute_sql_statement and get_citations."""
+
+    def test_forwards_parameters(self, mock_client):
+        """Test that bound parameters are passed to the statement API."""
+        statement = _statement(StatementState.SUCCEEDED)
+        mock_client.statement_execution.execute_statement.return_value = statement
+        parameters = [StatementParameterListItem(name="session_id", value="s-1")]
+
+        result = execute_sql_statement("DELETE FROM t WHERE session_id = :session_id", "wh-1", parameters)
+
+        assert result is statement
+        kwargs = mock_client.statement_execution.execute_statement.call_args.kwargs
+        assert kwargs["parameters"] == parameters
+
+    def test_failed_statement_returns_none(self, mock_client):
+        """Test that a failed statement returns None."""
+        mock_client.statement_execution.execute_statement.return_value = _statement(
+            StatementState.FAILED
+        )
+
+        assert execute_sql_statement("SELECT 1", "wh-1") is None
+
+    def test_get_citations_binds_ids(self, mock_client):
+        """Test that citation ids are bound to NULL-padded markers."""
+        mock_client.statement_execution.execute_statement.return_value = _statement(
+            StatementState.SUCCEEDED,
+            [["AU-TAX-001", "ATO", "Income Tax Act", "ITAA-1997", "https://ato.gov.au", "Tax"]]
+        )
+
+        citations = get_citations(["AU-TAX-001"], warehouse_id="wh-1")
+
+        assert citations[0]["regulation"] == "Income Tax Act (ITAA-1997)"
+        parameters = mock_client.statement_execution.execute_statement.call_args.kwargs["parameters"]
+        assert parameters[0] == StatementParameterListItem(name="c0", value="AU-TAX-001")
+        assert all(p.value is None for p in parameters[1:])
@@ -28,6 +28,7 @@ from shared.logging_config import (
     LogColors,
     _get_log_level_from_env,
     _create_log_directory,
+    _stop_queue_listener,
     disable_external_loggers,
     log_startup_info,
 )
@@ -433,6 +434,29 @@ class TestIntegration:
                     content = log_file.read_text()
                     assert "Test file message" in content or "Test error in file" in content
 
+    def test_end_to_end_non_blocking_logging(self):
+        """Test that queued records reach the file once the listener stops."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with patch("shared.logging_config._create_log_directory", return_value=Path(tmpdir)):
+                setup_logging(
+                    enable_console=False,
+                    enable_file=True,
+                    log_file="test.log",
+                    log_level=logging.INFO,
+                    non_blocking=True
+                )
+
+                handler_types = [type(h).__name__ for h in logging.getLogger().handlers]
+                assert handler_types == ["QueueHandler"]
+
+                get_logger(__name__).info("Queued file message")
+
+                # Stopping the listener drains the queue into the file handler
+                _stop_queue_listener()
+
+                content = (Path(tmpdir) / "test.log").read_text()
+                assert "Queued file message" in content
+
     def test_multiple_modules_logging(self, capsys):
         """Test logging from multiple modules."""
         setup_logging(enable_console=True, enable_file=False)
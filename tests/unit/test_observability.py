@@ -0,0 +1,101 @@
+"""
+Unit tests for observability module.
+
+Tests cover:
+- Agent run lifecycle addressed by run id
+- Ending a run from a different thread than the one that started it
+
+Author: Refactoring Team
+Date: 2024-11-24
+"""
+
+import threading
+import pytest
+from unittest.mock import Mock, patch
+
+from observability import AgentObservability
+
+
+# ============================================================================
+# FIXTURES
+# ============================================================================
+
+@pytest.fixture
+def mock_client():
+    """MlflowClient whose create_run returns a run with a fixed id."""
+    client = Mock()
+    client.create_run.return_value.info.run_id = "run-1"
+    return client
+
+
+@pytest.fixture
+def obs(mock_client):
+    """AgentObservability with MLflow tracking mocked out."""
+    with patch("observability.get_workspace_client"), \
+         patch("observability.ensure_mlflow_experiment", return_value="exp-1"), \
+         patch("observability.mlflow.tracking.MlflowClient", return_value=mock_client):
+        return AgentObservability(enable_mlflow=True, enable_lakehouse_monitoring=False)
+
+
+def _logged_metrics(mock_client):
+    """Metric key -> value across every log_batch call."""
+    return {
+        metric.key: metric.value
+        for call in mock_client.log_batch.call_args_list
+        for metric in call.kwargs["metrics"]
+    }
+
+
+# ============================================================================
+# RUN LIFECYCLE TESTS
+# ============================================================================
+
+class TestAgentRunLifecycle:
+    """Test suite for start_agent_run / end_agent_run."""
+
+    def test_start_creates_run_by_id(self, obs, mock_client):
+        """Test that the run is created through the client with tags and params."""
+        with patch("observability.mlflow.start_run") as fluent_start:
+            run_id = obs.start_agent_run("session-123", "M001", "AU", "question", tags={"validation_mode": "llm_judge"})
+
+        assert run_id == "run-1"
+        fluent_start.assert_not_called()
+        args, kwargs = mock_client.create_run.call_args
+        assert args == ("exp-1",)
+        assert kwargs["tags"]["validation_mode"] == "llm_judge"
+        params = {p.key: p.value for p in mock_client.log_batch.call_args.kwargs["params"]}
+        assert params["country"] == "AU"
+
+    def test_end_on_another_thread_logs_totals(self, obs, mock_client):
+        """Test that a run started here can be ended from a worker thread."""
+        obs.start_agent_run("session-123", "M001", "AU", "question")
+        obs.run_metrics["synthesis"] = {"cost": 0.02, "total_tokens": 100}
+
+        worker = threading.Thread(target=obs.end_agent_run, args=("answer",))
+        worker.start()
+        worker.join(5.0)
+
+        metrics = _logged_metrics(mock_client)
+        assert metrics["total.cost_usd"] == pytest.approx(0.02)
+        assert metrics["total.tokens"] == 100
+        tags = {t.key: t.value for t in mock_client.log_batch.call_args.kwargs["tags"]}
+        assert tags["status"] == "success"
+        mock_client.log_text.assert_called_once_with("run-1", "answer", "response.txt")
+        mock_client.set_terminated.assert_called_once_with("run-1", status="FINISHED")
+        assert obs.current_run is None
+
+    def test_end_failure_marks_run_failed(self, obs, mock_client):
+        """Test that a logging failure while ending still terminates the run."""
+        obs.start_agent_run("session-123", "M001", "AU", "question")
+        mock_client.log_dict.side_effect = Exception("artifact store down")
+
+        obs.end_agent_run("answer", success=False, error="boom")
+
+        mock_client.set_terminated.assert_called_once_with("run-1", status="FAILED")
+
+    def test_end_without_run_is_noop(self, obs, mock_client):
+        """Test that ending with no started run makes no tracking calls."""
+        obs.end_agent_run("answer")
+
+        mock_client.set_terminated.assert_not_called()
+        mock_client.log_batch.assert_not_called()
@@ -413,6 +413,71 @@ class TestResponseGeneration:
         assert result.cost == 0.0
         assert result.error is not None
 
+    @patch('agents.response_builder.WorkspaceClient')
+    @patch('agents.response_builder.get_template_manager')
+    @patch('agents.response_builder.ContextFormatter')
+    @patch('agents.response_builder.calculate_llm_cost')
+    def test_generate_response_cache_hit(
+        self, mock_calculate_cost, mock_context_formatter_cls,
+        mock_get_template, mock_workspace_client
+    ):
+        """Test that identical first-attempt requests are served from cache."""
+        mock_calculate_cost.return_value = 0.005
+
+        mock_workspace = Mock()
+        mock_message = Mock()
+        mock_message.content = "Cached AI response"
+        mock_choice = Mock()
+        mock_choice.message = mock_message
+        mock_llm_response = Mock()
+        mock_llm_response.choices = [mock_choice]
+        mock_llm_response.usage = Mock(prompt_tokens=500, completion_tokens=200)
+        mock_workspace.serving_endpoints.query.return_value = mock_llm_response
+
+        mock_get_template.return_value.render_system_prompt.return_value = "System prompt"
+        mock_context_formatter_cls.return_value.format_tool_results.return_value = "Formatted tools"
+
+        builder = ResponseBuilder(workspace_client=mock_workspace)
+        kwargs = dict(
+            user_query="Test query",
+            context="Test context",
+            tool_results={"tax": {"calculation": "5000"}},
+            country="AU"
+        )
+
+        first = builder.generate_response(**kwargs)
+        second = builder.generate_response(**kwargs)
+
+        assert mock_workspace.serving_endpoints.query.call_count == 1
+        assert first.cached is False
+        assert second.cached is True
+        assert second.text == "Cached AI response"
+        assert second.cost == 0.0
+
+        # Retries carry validation history and must bypass the cache
+        builder.generate_response(**kwargs, validation_history=[{"passed": False}])
+        assert mock_workspace.serving_endpoints.query.call_count == 2
+
+    @patch('agents.response_builder.WorkspaceClient')
+    @patch('agents.response_builder.get_template_manager')
+    @patch('agents.response_builder.ContextFormatter')
+    def test_build_prompt_reused_for_retries(
+        self, mock_context_formatter_cls, mock_get_template, mock_workspace_client
+    ):
+        """Test that retries with pre-formatted tool context reuse the built prompt."""
+        mock_get_template.return_value.render_system_prompt.return_value = "System prompt"
+
+        builder = ResponseBuilder(workspace_client=Mock())
+        args = ("Test query", "Test context", {}, "AU", "Formatted tools")
+
+        first = builder._build_prompt(*args)
+        with patch.object(builder, '_build_system_prompt') as mock_build_system:
+            second = builder._build_prompt(*args)
+
+        mock_build_system.assert_not_called()
+        assert second == first
+        assert first[1] == "Test context\n\nFormatted tools"
+
 
 class TestSingletonPattern:
     """Test suite for singleton pattern."""
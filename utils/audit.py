@@ -11,8 +11,8 @@ All audit and governance operations:
 """
 
 import json
-import traceback
 from typing import Optional, List, Dict, Any
+from databricks.sdk.service.sql import StatementParameterListItem
 from utils.lakehouse import execute_sql_statement, get_audit_logs as db_get_audit_logs, get_cost_summary as db_get_cost_summary
 from shared.logging_config import get_logger
 
@@ -23,6 +23,21 @@ logger = get_logger(__name__)
 # CORE AUDIT LOGGING
 # ============================================================================
 
+_QUERY_EVENT_INSERT = """
+INSERT INTO super_advisory_demo.member_data.governance (
+    event_id, timestamp, user_id, session_id, country, query_string,
+    agent_response, result_preview, cost, citations, tool_used,
+    judge_response, judge_verdict, judge_confidence,
+    error_info, validation_mode, validation_attempts, total_time_seconds
+)
+VALUES (
+    uuid(), current_timestamp(), :user_id, :session_id, :country, :query_string,
+    :agent_response, :result_preview, :cost, :citations, :tool_used,
+    :judge_response, :judge_verdict, :judge_confidence,
+    :error_info, :validation_mode, :validation_attempts, :total_time_seconds
+)
+"""
+
 def log_query_event(
     user_id: str,
     session_id: str,
@@ -84,42 +99,36 @@ def log_query_event(
         # Format citations
         citations_json = build_citation_json(citations)
         
-        # Build the SQL
-        insert_sql = f"""
-        INSERT INTO super_advisory_demo.member_data.governance (
-            event_id, timestamp, user_id, session_id, country, query_string,
-            agent_response, result_preview, cost, citations, tool_used,
-            judge_response, judge_verdict, judge_confidence,
-            error_info, validation_mode, validation_attempts, total_time_seconds
-        )
-        VALUES (
-            uuid(),
-            current_timestamp(),
-            '{_escape_sql(user_id)}',
-            '{_escape_sql(session_id)}',
-            '{_escape_sql(country)}',
-            '{_escape_sql(query_string)}',
-            '{_escape_sql(response_text)}',
-            '{_escape_sql(result_preview)}',
-            {cost},
-            '{_escape_sql(citations_json)}',
-            '{_escape_sql(tool_used)}',
-            '{_escape_sql(judge_response)}',
-            '{_escape_sql(judge_verdict)}',
-            {judge_confidence if judge_confidence is not None else 0.0},
-            '{_escape_sql(error_info)}',
-            '{_escape_sql(validation_mode)}',
-            {validation_attempts},
-            {total_time_seconds}
-        )
-        """
-
-        execute_sql_statement(insert_sql, SQL_WAREHOUSE_ID)
+        # Values are bound as statement parameters, so no SQL escaping pass
+        # runs over the (potentially large) response text
+        values = {
+            "user_id": (user_id, "STRING"),
+            "session_id": (session_id, "STRING"),
+            "country": (country, "STRING"),
+            "query_string": (query_string, "STRING"),
+            "agent_response": (response_text, "STRING"),
+            "result_preview": (result_preview, "STRING"),
+            "cost": (cost, "DOUBLE"),
+            "citations": (citations_json, "STRING"),
+            "tool_used": (tool_used, "STRING"),
+            "judge_response": (judge_response, "STRING"),
+            "judge_verdict": (judge_verdict, "STRING"),
+            "judge_confidence": (judge_confidence if judge_confidence is not None else 0.0, "DOUBLE"),
+            "error_info": (error_info, "STRING"),
+            "validation_mode": (validation_mode, "STRING"),
+            "validation_attempts": (validation_attempts, "INT"),
+            "total_time_seconds": (total_time_seconds, "DOUBLE"),
+        }
+        parameters = [
+            StatementParameterListItem(name=name, value="" if value is None else str(value), type=sql_type)
+            for name, (value, sql_type) in values.items()
+        ]
+
+        execute_sql_statement(_QUERY_EVENT_INSERT, SQL_WAREHOUSE_ID, parameters)
         logger.info(f"✅ Logged event (country={country}, cost=${cost:.4f}, verdict={judge_verdict})")
 
     except Exception as e:
-        logger.error(f"⚠️ Error logging governance event: {e}")
-        traceback.print_exc()
+        logger.exception("⚠️ Error logging governance event: %s", e)
 
 
 # ============================================================================
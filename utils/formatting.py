@@ -4,9 +4,12 @@ Formatting Utilities
 Currency formatting, number parsing, and other formatting helpers.
 """
 
+from functools import lru_cache
+
 from country_config import get_currency_info
 
 
+@lru_cache(maxsize=8)
 def get_currency(country: str) -> str:
     """
     Get currency code for a country.
@@ -21,6 +24,7 @@ def get_currency(country: str) -> str:
     return currency_info["code"]  # "AUD", "USD", "GBP", "INR"
 
 
+@lru_cache(maxsize=8)
 def get_currency_symbol(country: str) -> str:
     """
     Get currency symbol for a country.
@@ -48,6 +52,10 @@ def safe_float(value, default: float = 0.0) -> float:
     """
     if value is None:
         return default
+    # Fast path for values that are already numeric (no string handling)
+    value_type = type(value)
+    if value_type is float or value_type is int:
+        return float(value) if value else default
     try:
         if isinstance(value, str):
             value = value.replace(",", "").strip()
@@ -12,22 +12,41 @@ Eliminates duplicate execute_query() functions!
 """
 
 import pandas as pd
+import threading
 import time
 from typing import Optional, List, Dict
 from databricks.sdk import WorkspaceClient
-from databricks.sdk.service.sql import StatementState
+from databricks.sdk.core import Config
+from databricks.sdk.service.sql import StatementState, StatementParameterListItem
 from shared.logging_config import get_logger
 
 logger = get_logger(__name__)
 
 # Single WorkspaceClient instance
 _workspace_client = None
+_workspace_client_lock = threading.Lock()
+
+# HTTP settings for the shared client: bounded timeouts plus a keep-alive
+# connection pool so statement/serving calls reuse TLS sessions.
+WORKSPACE_HTTP_TIMEOUT_SECONDS = 30
+WORKSPACE_RETRY_TIMEOUT_SECONDS = 60
+WORKSPACE_MAX_CONNECTION_POOLS = 16
+WORKSPACE_MAX_CONNECTIONS_PER_POOL = 32
 
 def get_workspace_client() -> WorkspaceClient:
     """Get or create WorkspaceClient singleton."""
     global _workspace_client
     if _workspace_client is None:
-        _workspace_client = WorkspaceClient()
+        # Agents are built concurrently (process_queries_batch); create only one client
+        with _workspace_client_lock:
+            if _workspace_client is None:
+                # HTTP settings are Config fields, not WorkspaceClient kwargs
+                _workspace_client = WorkspaceClient(config=Config(
+                    http_timeout_seconds=WORKSPACE_HTTP_TIMEOUT_SECONDS,
+                    retry_timeout_seconds=WORKSPACE_RETRY_TIMEOUT_SECONDS,
+                    max_connection_pools=WORKSPACE_MAX_CONNECTION_POOLS,
+                    max_connections_per_pool=WORKSPACE_MAX_CONNECTIONS_PER_POOL
+                ))
     return _workspace_client
 
 
@@ -35,7 +54,11 @@ def get_workspace_client() -> WorkspaceClient:
 # CORE SQL EXECUTION
 # ============================================================================
 
-def execute_sql_query(query: str, warehouse_id: Optional[str] = None) -> pd.DataFrame:
+def execute_sql_query(
+    query: str,
+    warehouse_id: Optional[str] = None,
+    parameters: Optional[List[StatementParameterListItem]] = None
+) -> pd.DataFrame:
     """
     Execute SQL query and return DataFrame.
     
@@ -44,6 +67,7 @@ def execute_sql_query(query: str, warehouse_id: Optional[str] = None) -> pd.Data
     Args:
         query: SQL query string
         warehouse_id: Optional warehouse ID (uses config default if not provided)
+        parameters: Optional bound values for ``:name`` markers in the query
         
     Returns:
         pandas DataFrame with results
@@ -66,6 +90,7 @@ def execute_sql_query(query: str, warehouse_id: Optional[str] = None) -> pd.Data
         statement = w.statement_execution.execute_statement(
             warehouse_id=wh_id,
             statement=query,
+            parameters=parameters,
             wait_timeout="30s"
         )
         
@@ -89,7 +114,11 @@ def execute_sql_query(query: str, warehouse_id: Optional[str] = None) -> pd.Data
         raise Exception(f"SQL execution error: {str(e)}")
 
 
-def execute_sql_statement(query: str, warehouse_id: Optional[str] = None):
+def execute_sql_statement(
+    query: str,
+    warehouse_id: Optional[str] = None,
+    parameters: Optional[List[StatementParameterListItem]] = None
+):
     """
     Execute SQL statement and return raw statement result.
     
@@ -98,6 +127,7 @@ def execute_sql_statement(query: str, warehouse_id: Optional[str] = None):
     Args:
         query: SQL statement string
         warehouse_id: Optional warehouse ID
+        parameters: Optional bound values for ``:name`` markers in the query
         
     Returns:
         Statement execution result or None if failed
@@ -115,6 +145,7 @@ def execute_sql_statement(query: str, warehouse_id: Optional[str] = None):
         statement = w.statement_execution.execute_statement(
             warehouse_id=wh_id,
             statement=query,
+            parameters=parameters,
             wait_timeout="30s"
         )
         
@@ -205,6 +236,24 @@ def get_members_by_country(country_code: str, default_return: Optional[pd.DataFr
 # CITATION OPERATIONS
 # ============================================================================
 
+CITATION_ID_SLOTS = 8
+
+
+def _citation_id_query(slots: int) -> str:
+    """Build the parameterized citation-by-id query for ``slots`` placeholders."""
+    placeholders = ", ".join(f":c{i}" for i in range(slots))
+    return (
+        "SELECT citation_id, authority, regulation_name, regulation_code, "
+        "source_url, description\n"
+        "FROM super_advisory_demo.member_data.citation_registry\n"
+        f"WHERE citation_id IN ({placeholders})\n"
+        "ORDER BY citation_id"
+    )
+
+
+_CITATION_ID_QUERY = _citation_id_query(CITATION_ID_SLOTS)
+
+
 def get_citations(citation_ids: List[str], warehouse_id: Optional[str] = None) -> List[Dict]:
     """
     Fetch citations from registry.
@@ -222,18 +271,20 @@ def get_citations(citation_ids: List[str], warehouse_id: Optional[str] = None) -
     from config import SQL_WAREHOUSE_ID
     wh_id = warehouse_id or SQL_WAREHOUSE_ID
     
-    ids_str = "', '".join(citation_ids)
-    query = f"""
-    SELECT 
-        citation_id, authority, regulation_name, regulation_code,
-        source_url, description
-    FROM super_advisory_demo.member_data.citation_registry
-    WHERE citation_id IN ('{ids_str}')
-    ORDER BY citation_id
-    """
+    # Bind ids to a fixed number of :c<i> markers (NULL-padded) so the
+    # statement text is identical across calls and the warehouse can reuse
+    # its cached plan.
+    slots = max(CITATION_ID_SLOTS, len(citation_ids))
+    query = _CITATION_ID_QUERY if slots == CITATION_ID_SLOTS else _citation_id_query(slots)
+    parameters = [
+        StatementParameterListItem(
+            name=f"c{i}", value=citation_ids[i] if i < len(citation_ids) else None
+        )
+        for i in range(slots)
+    ]
     
     try:
-        result = execute_sql_statement(query, wh_id)
+        result = execute_sql_statement(query, wh_id, parameters)
         if not result or not result.result or not result.result.data_array:
             return []
         
@@ -13,40 +13,70 @@
 # ✅ REFACTORED: Token calculation extracted to validation.token_calculator
 # ✅ REFACTORED: JSON parsing extracted to validation.json_parser
 
-from databricks.sdk import WorkspaceClient
 from databricks.sdk.service.serving import ChatMessage, ChatMessageRole
-from config import JUDGE_LLM_ENDPOINT, JUDGE_LLM_TEMPERATURE, JUDGE_LLM_MAX_TOKENS
+from config import JUDGE_LLM_ENDPOINT, JUDGE_LLM_TEMPERATURE, JUDGE_LLM_MAX_TOKENS, detect_model_type
 from prompts_registry import get_prompts_registry
 from validation.token_calculator import get_token_calculator
 from validation.json_parser import get_json_parser
 import time
 import re
+from string import Formatter
 
+from utils.lakehouse import get_workspace_client
+from shared.cache import TTLCache, make_cache_key
 from shared.logging_config import get_logger
 
 logger = get_logger(__name__)
 
+# Judge verdicts keyed by everything the judge sees. An identical response
+# (e.g. a synthesis cache hit) is never re-judged within the TTL.
+_verdict_cache = TTLCache(maxsize=1024, ttl=3600.0)
+
+_CONVERSIONS = {None: None, "s": str, "r": repr, "a": ascii}
+
+
+def _compile_prompt_template(template):
+    """
+    Pre-split a str.format template into (literal, field, spec, conversion) segments.
+
+    The judge prompt is several KB of static text around six slots; parsing
+    it once lets each render be a join over the segments instead of a full
+    str.format scan of the template.
+    """
+    return [
+        (literal, field, spec or "", _CONVERSIONS[conversion])
+        for literal, field, spec, conversion in Formatter().parse(template)
+    ]
+
+
+def _render_prompt_template(segments, **values):
+    """Render segments from _compile_prompt_template (same output as str.format)."""
+    parts = []
+    for literal, field, spec, convert in segments:
+        parts.append(literal)
+        if field is not None:
+            value = values[field]
+            parts.append(format(convert(value) if convert else value, spec))
+    return "".join(parts)
+
+
 class LLMJudgeValidator:
     """LLM-as-a-Judge validator using Claude for fair validation"""
 
     def __init__(self, judge_endpoint=None, prompts_registry=None):
-        self.w = WorkspaceClient()
+        self.w = get_workspace_client()
         self.judge_endpoint = judge_endpoint or JUDGE_LLM_ENDPOINT
         self.prompts_registry = prompts_registry or get_prompts_registry()
+        self._validation_template = _compile_prompt_template(
+            self.prompts_registry.get_validation_prompt_template()
+        )
 
         # Initialize token calculator and JSON parser
         self.token_calculator = get_token_calculator()
         self.json_parser = get_json_parser()
 
         # Determine model type from endpoint name for cost calculation
-        if "opus" in self.judge_endpoint.lower():
-            self.model_type = "claude-opus-4-1"
-        elif "sonnet" in self.judge_endpoint.lower():
-            self.model_type = "claude-sonnet-4"
-        elif "haiku" in self.judge_endpoint.lower():
-            self.model_type = "claude-haiku-4"
-        else:
-            self.model_type = "claude-sonnet-4"  # default
+        self.model_type = detect_model_type(self.judge_endpoint)
 
         logger.info(f"✓ LLM Judge initialized: {self.judge_endpoint} (model: {self.model_type})")
     
@@ -86,6 +116,22 @@ class LLMJudgeValidator:
                     "duration": 0.0
                 }
         
+        verdict_key = make_cache_key(
+            self.judge_endpoint, response_text, user_query, context, member_profile, tool_output
+        )
+        cached_verdict = _verdict_cache.get(verdict_key)
+        if cached_verdict is not None:
+            logger.info(f"💾 Judge verdict cache hit - Passed: {cached_verdict['passed']}")
+            return {
+                **cached_verdict,
+                'input_tokens': 0,
+                'output_tokens': 0,
+                'total_tokens': 0,
+                'cost': 0.0,
+                'duration': 0.0,
+                'cached': True
+            }
+        
         try:
             logger.info(f"\n📊 VALIDATION DEBUG:")
             logger.info(f"📊 Full response length: {len(response_text)} chars")
@@ -157,6 +203,8 @@ class LLMJudgeValidator:
                 else:
                     logger.info(f"✅ No violations found")
                 
+                # Only genuine judge verdicts are cached (never fallbacks)
+                _verdict_cache.set(verdict_key, validation_result)
                 return validation_result
             else:
                 logger.info(f"⚠️ LLM Judge JSON parsing FAILED - Falling back to keyword analysis")
@@ -196,11 +244,9 @@ class LLMJudgeValidator:
         member_info = self.prompts_registry.get_member_profile_format(member_profile)
         tool_info, tool_status, tool_failures = self.prompts_registry.get_tool_output_format(tool_output)
         
-        # Get validation prompt template from registry
-        prompt_template = self.prompts_registry.get_validation_prompt_template()
-        
-        # Fill in the template
-        prompt = prompt_template.format(
+        # Fill in the template (pre-split once in __init__)
+        prompt = _render_prompt_template(
+            self._validation_template,
             user_query=user_query,
             member_info=member_info,
             tool_info=tool_info,